@@ -0,0 +1,168 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Callable, Deque, Dict, Tuple
+
+# Priority lanes. Medical refusals and emergency questions go in HIGH: they are
+# admitted first, may use reserved capacity, and are never shed while a NORMAL
+# request is still waiting.
+HIGH = "high"
+NORMAL = "normal"
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed; `retry_after` is the suggested wait in seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Server overloaded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounds the requests running at once and the requests waiting for a slot.
+
+    Up to `max_in_flight` requests run; HIGH requests may use `high_reserve` more.
+    Others wait in a per-lane FIFO queue of at most `max_queue` entries for up to
+    `queue_timeout` seconds, and are shed with Overloaded past either limit. A freed
+    slot goes to the oldest HIGH waiter first. When the queue is full, a HIGH arrival
+    displaces the newest NORMAL waiter instead of being turned away.
+
+    Meant for a single event loop; all bookkeeping happens on the loop thread.
+    """
+
+    def __init__(self, max_in_flight: int = 8, max_queue: int = 64, queue_timeout: float = 2.0,
+                 high_reserve: int = 2, retry_after: float = 1.0):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.high_reserve = high_reserve
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.shed: Dict[Tuple[str, str], int] = {}
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {HIGH: deque(), NORMAL: deque()}
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters[HIGH]) + len(self._waiters[NORMAL])
+
+    def _limit(self, priority: str) -> int:
+        return self.max_in_flight + (self.high_reserve if priority == HIGH else 0)
+
+    def _shed(self, reason: str, priority: str) -> Overloaded:
+        key = (reason, priority)
+        self.shed[key] = self.shed.get(key, 0) + 1
+        return Overloaded(reason, self.retry_after)
+
+    async def acquire(self, priority: str = NORMAL):
+        if self.in_flight < self._limit(priority) and not self._waiters[priority] \
+                and (priority == HIGH or not self._waiters[HIGH]):
+            self.in_flight += 1
+            return
+
+        if self.queued >= self.max_queue:
+            if priority == HIGH and self._waiters[NORMAL]:
+                victim = self._waiters[NORMAL].pop()
+                victim.set_exception(self._shed("displaced", NORMAL))
+            else:
+                raise self._shed("queue_full", priority)
+
+        waiter = asyncio.get_running_loop().create_future()
+        lane = self._waiters[priority]
+        lane.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                return  # handed a slot just as the timeout fired
+            self._forget(lane, waiter)
+            raise self._shed("timeout", priority)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self.release()
+            else:
+                self._forget(lane, waiter)
+            raise
+
+    def _forget(self, lane: Deque[asyncio.Future], waiter: asyncio.Future):
+        try:
+            lane.remove(waiter)
+        except ValueError:
+            pass
+        if not waiter.done():
+            waiter.cancel()
+
+    def release(self):
+        self.in_flight -= 1
+        # Hand the freed slot straight to the next waiter that may use it
+        for priority in (HIGH, NORMAL):
+            lane = self._waiters[priority]
+            while lane and self.in_flight < self._limit(priority):
+                waiter = lane.popleft()
+                if not waiter.done():
+                    self.in_flight += 1
+                    waiter.set_result(None)
+                    return
+
+    async def admit(self, priority: str = NORMAL) -> Callable[[], None]:
+        """
+        Acquires a slot and returns its release function, which is safe to call
+        more than once; for slots held past the handler, e.g. by a streaming body.
+        """
+        await self.acquire(priority)
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.release()
+        return release
+
+    @asynccontextmanager
+    async def slot(self, priority: str = NORMAL):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class TokenBucketLimiter:
+    """
+    Per-key token buckets: each key may make `burst` requests at once and
+    `rate` per second after that. Buckets are kept in LRU order and the least
+    recently used are dropped beyond `max_keys`, which forgives their history.
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def check(self, key: str) -> float:
+        """
+        Takes a token for `key`. Returns 0 if one was available, otherwise the
+        seconds until the next one.
+        """
+        now = time.monotonic()
+        tokens, last = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+def retry_after_header(seconds: float) -> Dict[str, str]:
+    # Retry-After takes whole seconds
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
@@ -0,0 +1,272 @@
+"""
+Compiles hospital data JSON into a flat, memory-mappable binary snapshot.
+
+Lists of flat string records (doctors, departments) are stored column by column:
+one UTF-8 blob per column plus an int64 offsets array and a presence mask. The
+retrieval index is stored prebuilt, as its fact texts, vocabulary and sparse
+arrays. Workers map the file read-only, so the bulk of the data lives in shared
+page cache instead of each process's heap, and none of it is parsed or tokenized
+at startup. Records are read through small `__slots__` views that decode a field
+only when it is accessed. Everything else is kept as JSON in the header.
+
+    python -m app.binary_snapshot ../data/hospital_info.json   # from backend/
+
+The snapshot records the SHA-256 of the JSON it was compiled from and is ignored
+once the JSON changes, so a stale snapshot can never be served.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from .retrieval import Fact, RetrievalIndex
+
+MAGIC = b"HBSNAP02"
+_HEADER_LEN = struct.Struct("<Q")
+_ALIGN = 8
+
+
+def snapshot_path_for(json_path: str) -> str:
+    return os.path.splitext(json_path)[0] + ".snap"
+
+
+def _tabular(value) -> Optional[List[str]]:
+    """Column names if `value` is a non-empty list of records with string values only."""
+    if not isinstance(value, list) or not value:
+        return None
+    columns: Dict[str, None] = {}
+    for record in value:
+        if not isinstance(record, dict) or not all(isinstance(v, str) for v in record.values()):
+            return None
+        columns.update(dict.fromkeys(record))
+    return list(columns)
+
+
+class _Writer:
+    """Appends 8-byte aligned sections to the snapshot body and returns their metadata."""
+
+    def __init__(self):
+        self.body = bytearray()
+
+    def _start(self) -> int:
+        self.body.extend(b"\0" * (-len(self.body) % _ALIGN))
+        return len(self.body)
+
+    def array(self, values: np.ndarray) -> Dict:
+        values = np.ascontiguousarray(values)
+        offset = self._start()
+        self.body.extend(values.tobytes())
+        return {"offset": offset, "dtype": values.dtype.str, "count": int(values.size)}
+
+    def strings(self, values: List[Optional[str]]) -> Dict:
+        """A string column; None entries are stored as absent."""
+        encoded = [(v or "").encode("utf-8") for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(chunk) for chunk in encoded], out=offsets[1:])
+        meta = {"offsets": self.array(offsets),
+                "present": self.array(np.array([v is not None for v in values], dtype=np.uint8))}
+        meta["blob"] = self._start()
+        for chunk in encoded:
+            self.body.extend(chunk)
+        return meta
+
+    def table(self, records: List[Dict], columns: List[str]) -> Dict:
+        return {"rows": len(records),
+                "columns": {c: self.strings([r.get(c) for r in records]) for c in columns}}
+
+
+def compile_snapshot(json_path: str, out_path: Optional[str] = None) -> str:
+    """
+    Writes the binary snapshot for `json_path` and returns its path. Raises
+    ValueError if the JSON is not valid hospital data.
+    """
+    from .hospital_data import validate_hospital_data
+
+    with open(json_path, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw)
+    validate_hospital_data(data)
+
+    writer = _Writer()
+    tables: Dict[str, Dict] = {}
+    fields: Dict[str, object] = {}
+    for key, value in data.items():
+        columns = _tabular(value)
+        if columns is None:
+            fields[key] = value
+        else:
+            tables[key] = writer.table(value, columns)
+
+    index = RetrievalIndex.from_data(data)
+    retrieval = {
+        "facts": writer.table([fact._asdict() for fact in index.facts], list(Fact._fields)),
+        "terms": writer.strings(list(index.vocabulary)),
+        "arrays": {name: writer.array(values) for name, values in index.arrays().items()},
+    }
+
+    header = json.dumps({
+        "source_sha256": hashlib.sha256(raw).hexdigest(),
+        "key_order": list(data),
+        "fields": fields,
+        "tables": tables,
+        "retrieval": retrieval,
+    }).encode("utf-8")
+    prefix = bytearray(MAGIC + _HEADER_LEN.pack(len(header)) + header)
+    prefix.extend(b"\0" * (-len(prefix) % _ALIGN))
+
+    out_path = out_path or snapshot_path_for(json_path)
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(prefix)
+        f.write(writer.body)
+    # Readers either see the old snapshot or the complete new one
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def _array(buffer, base: int, meta: Dict) -> np.ndarray:
+    # Read-only views of the mapping, not copies
+    return np.frombuffer(buffer, dtype=np.dtype(meta["dtype"]), count=meta["count"], offset=base + meta["offset"])
+
+
+class _Column:
+    __slots__ = ("offsets", "present", "blob")
+
+    def __init__(self, view: memoryview, base: int, meta: Dict):
+        # memoryview casts index faster than numpy arrays for single elements
+        start = base + meta["offsets"]["offset"]
+        self.offsets = view[start:start + 8 * meta["offsets"]["count"]].cast("q")
+        start = base + meta["present"]["offset"]
+        self.present = view[start:start + meta["present"]["count"]]
+        self.blob = view[base + meta["blob"]:]
+
+    def get(self, row: int) -> Optional[str]:
+        if not self.present[row]:
+            return None
+        return str(self.blob[self.offsets[row]:self.offsets[row + 1]], "utf-8")
+
+
+class RecordTable(Sequence):
+    """A read-only list of records backed by the mapped snapshot."""
+
+    def __init__(self, view: memoryview, base: int, meta: Dict):
+        self._rows = meta["rows"]
+        self.columns: Dict[str, _Column] = {name: _Column(view, base, col) for name, col in meta["columns"].items()}
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Record(self, i) for i in range(*index.indices(self._rows))]
+        if index < 0:
+            index += self._rows
+        if not 0 <= index < self._rows:
+            raise IndexError(index)
+        return Record(self, index)
+
+    def has(self, column: str, row: int) -> bool:
+        col = self.columns.get(column)
+        return col is not None and bool(col.present[row])
+
+
+class Record(Mapping):
+    """A dict-like view of one row; fields are decoded from the mapping on access."""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: RecordTable, row: int):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, key: str) -> str:
+        # Inlined _Column.get: field reads are on the answer path
+        col = self._table.columns.get(key)
+        row = self._row
+        if col is None or not col.present[row]:
+            raise KeyError(key)
+        return str(col.blob[col.offsets[row]:col.offsets[row + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return (c for c in self._table.columns if self._table.has(c, self._row))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class _FactTable(Sequence):
+    """The retrieval index's facts, read from the mapped snapshot as they are hit."""
+
+    def __init__(self, table: RecordTable):
+        self._path = table.columns["path"]
+        self._text = table.columns["text"]
+        self._rows = len(table)
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __getitem__(self, index) -> Fact:
+        if not -self._rows <= index < self._rows:
+            raise IndexError(index)
+        index %= self._rows
+        return Fact(self._path.get(index), self._text.get(index))
+
+
+class CompiledData(NamedTuple):
+    data: Dict
+    source_sha256: str
+    retrieval: RetrievalIndex
+
+
+def load_snapshot(path: str, expected_sha256: Optional[str] = None) -> Optional[CompiledData]:
+    """
+    Maps the snapshot at `path`, with record lists as RecordTables. Returns None if
+    the file is missing, corrupt, or was compiled from different JSON than
+    `expected_sha256`.
+    """
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        if mapped[:len(MAGIC)] != MAGIC:
+            return None
+        (header_len,) = _HEADER_LEN.unpack_from(mapped, len(MAGIC))
+        header_start = len(MAGIC) + _HEADER_LEN.size
+        header = json.loads(mapped[header_start:header_start + header_len])
+        if expected_sha256 is not None and header["source_sha256"] != expected_sha256:
+            return None
+        base = header_start + header_len
+        base += -base % _ALIGN
+        view = memoryview(mapped)
+
+        values = dict(header["fields"])
+        for key, meta in header["tables"].items():
+            values[key] = RecordTable(view, base, meta)
+        data = {key: values[key] for key in header["key_order"]}
+
+        meta = header["retrieval"]
+        terms = _Column(view, base, meta["terms"])
+        retrieval = RetrievalIndex.from_arrays(
+            _FactTable(RecordTable(view, base, meta["facts"])),
+            [terms.get(i) for i in range(meta["terms"]["present"]["count"])],
+            **{name: _array(mapped, base, arr) for name, arr in meta["arrays"].items()})
+        return CompiledData(data, header["source_sha256"], retrieval)
+    except (ValueError, KeyError, TypeError, struct.error):
+        return None
+
+
+if __name__ == "__main__":
+    for json_path in sys.argv[1:] or [os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__)))), "data", "hospital_info.json")]:
+        print(f"{json_path} -> {compile_snapshot(json_path)}")
@@ -0,0 +1,184 @@
+import json
+import os
+import re
+import zlib
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .intents import Classification, IntentMatcher, MEDICAL_INTENT, intent_matcher
+
+# Labelled messages the linear guardian is fitted on at startup, one JSON object per line
+TRAINING_FILE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "guardian_training.jsonl")
+
+KEYWORD_ENGINE = "keyword"
+LINEAR_ENGINE = "linear"
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+@lru_cache(maxsize=50000)
+def _word_buckets(word: str, n_features: int) -> Tuple[int, ...]:
+    # A word's own features (unigram and character 3-5 grams) never change, so
+    # hashing them is cached per word; only bigrams are hashed per message
+    padded = f"<{word}>"
+    features = [f"w:{word}"]
+    for n in (3, 4, 5):
+        features.extend(f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+    mask = n_features - 1
+    return tuple(zlib.crc32(f.encode()) & mask for f in features)
+
+
+def _buckets(text: str, n_features: int) -> List[int]:
+    """
+    Hash buckets of a message's word unigrams and bigrams plus the character
+    3-5 grams of each padded word, so paraphrases ("hurts"/"hurting") and
+    misspellings share most of their features.
+    """
+    words = _TOKEN_RE.findall(text.lower())
+    mask = n_features - 1
+    buckets = [zlib.crc32(f"b:{a} {b}".encode()) & mask for a, b in zip(words, words[1:])]
+    for w in words:
+        buckets.extend(_word_buckets(w, n_features))
+    return buckets
+
+
+class HashingVectorizer:
+    """
+    Maps messages to fixed-width L2-normalized count vectors by hashing their
+    features into `n_features` buckets; there is no vocabulary to store or grow.
+    crc32 rather than hash() keeps buckets stable across processes.
+    """
+
+    def __init__(self, n_features: int = 1 << 14):
+        self.n_features = n_features
+
+    def transform_sparse(self, messages: Sequence[str]):
+        """
+        The nonzero entries of `transform(messages)` as (rows, cols, values) in
+        coordinate form; a short message touches ~100 of the buckets.
+        """
+        rows, cols = [], []
+        for row, message in enumerate(messages):
+            buckets = _buckets(message, self.n_features)
+            rows.extend([row] * len(buckets))
+            cols.extend(buckets)
+        keys, counts = np.unique(np.asarray(rows, dtype=np.int64) * self.n_features + np.asarray(cols, dtype=np.int64),
+                                 return_counts=True)
+        rows, cols = np.divmod(keys, self.n_features)
+        values = counts.astype(np.float32)
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=len(messages))).astype(np.float32)
+        if len(rows):
+            values /= norms[rows]
+        return rows, cols, values
+
+    def transform(self, messages: Sequence[str]) -> np.ndarray:
+        rows, cols, values = self.transform_sparse(messages)
+        matrix = np.zeros((len(messages), self.n_features), dtype=np.float32)
+        matrix[rows, cols] = values
+        return matrix
+
+
+class LinearGuardian:
+    """
+    Logistic regression over hashed n-gram features. A whole batch of messages
+    is scored with one sparse matrix-vector product: the weights of every
+    (message, bucket) entry are gathered at once and summed per message.
+    """
+
+    def __init__(self, weights: np.ndarray, bias: float, vectorizer: HashingVectorizer, threshold: float = 0.5):
+        self.weights = weights.astype(np.float32)
+        self.bias = float(bias)
+        self.vectorizer = vectorizer
+        self.threshold = threshold
+
+    @classmethod
+    def fit(cls, texts: Sequence[str], labels: Sequence[int], threshold: float = 0.5,
+            n_features: int = 1 << 14, epochs: int = 300, learning_rate: float = 4.0,
+            l2: float = 1e-4) -> "LinearGuardian":
+        """Full-batch gradient descent on the L2-regularized log loss; deterministic."""
+        vectorizer = HashingVectorizer(n_features)
+        x = vectorizer.transform(texts)
+        y = np.asarray(labels, dtype=np.float32)
+        weights = np.zeros(n_features, dtype=np.float32)
+        bias = 0.0
+        n = len(y)
+        for _ in range(epochs):
+            p = 1.0 / (1.0 + np.exp(-(x @ weights + bias)))
+            error = p - y
+            weights -= learning_rate * (x.T @ error / n + l2 * weights)
+            bias -= learning_rate * float(error.mean())
+        return cls(weights, bias, vectorizer, threshold)
+
+    @classmethod
+    def from_file(cls, path: str = TRAINING_FILE_PATH, threshold: float = 0.5) -> "LinearGuardian":
+        texts, labels = [], []
+        with open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    texts.append(record["text"])
+                    labels.append(int(record["medical"]))
+        return cls.fit(texts, labels, threshold=threshold)
+
+    def scores(self, messages: Sequence[str]) -> np.ndarray:
+        """Probability that each message asks for medical advice."""
+        if not messages:
+            return np.zeros(0, dtype=np.float32)
+        rows, cols, values = self.vectorizer.transform_sparse(messages)
+        logits = np.bincount(rows, weights=values * self.weights[cols], minlength=len(messages)) + self.bias
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def predict_many(self, messages: Sequence[str]) -> np.ndarray:
+        return self.scores(messages) >= self.threshold
+
+
+class Guardian:
+    """
+    The guardian verdict for the graph. The keyword matcher always supplies the
+    topic. With a model attached, a message is medical if either the model or the
+    keyword rule flags it, so the model can only add to the rule's recall.
+    """
+
+    def __init__(self, matcher: IntentMatcher, model: Optional[LinearGuardian] = None):
+        self.matcher = matcher
+        self.model = model
+        self.engine = LINEAR_ENGINE if model is not None else KEYWORD_ENGINE
+
+    def classify(self, message: str) -> Classification:
+        if self.model is None:
+            return self.matcher.classify(message)
+        return self.classify_many([message])[0]
+
+    def classify_many(self, messages: Iterable[str]) -> List[Classification]:
+        messages = list(messages)
+        verdicts = self.matcher.classify_many(messages)
+        if self.model is None:
+            return verdicts
+        medical = self.model.predict_many(messages)
+        results = []
+        for verdict, is_medical in zip(verdicts, medical):
+            # A keyword hit stays medical even when the model disagrees
+            if is_medical and verdict.intent != MEDICAL_INTENT:
+                results.append(Classification(MEDICAL_INTENT, None))
+            else:
+                results.append(verdict)
+        return results
+
+
+def build_guardian(engine: str = KEYWORD_ENGINE, threshold: float = 0.5,
+                   matcher: IntentMatcher = intent_matcher) -> Guardian:
+    """
+    The guardian for `engine`. Falls back to the keyword rule when the linear
+    model can't be trained (e.g. the training file is missing or malformed).
+    """
+    if engine == KEYWORD_ENGINE:
+        return Guardian(matcher)
+    if engine != LINEAR_ENGINE:
+        raise ValueError(f"unknown guardian engine {engine!r}")
+    try:
+        return Guardian(matcher, LinearGuardian.from_file(threshold=threshold))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Linear guardian unavailable, using keyword rule: {e}")
+        return Guardian(matcher)
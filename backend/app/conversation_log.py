@@ -0,0 +1,348 @@
+"""
+Conversation audit log: every chat result (question, intent, data version, latency)
+as zstd-compressed JSON lines in append-only, size-rotated segment files.
+
+Request handlers only append a record to a bounded in-memory queue; a background
+thread serializes and compresses whole batches. The analytics CLI streams segments
+one chunk at a time, so its memory does not grow with the size of the log:
+
+    python -m app.conversation_log ../logs/conversations
+    python -m app.conversation_log --json --top 20 segment-*.jsonl.zst
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import zstandard
+
+from .intents import HOSPITAL_INTENT, MEDICAL_INTENT
+
+# Default home of the segment files, next to data/
+LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "logs", "conversations")
+
+SEGMENT_SUFFIX = ".jsonl.zst"
+
+# Record fields, in the order `record` queues them
+FIELDS = ("ts", "endpoint", "hospital", "session", "message", "intent", "topic", "answered",
+          "data_version", "latency_ms")
+
+# Long messages are cut before they are queued so the queue's memory stays bounded
+MAX_MESSAGE_CHARS = 2000
+
+# Latency histogram for the analytics: log-spaced buckets 1% apart from 10 µs to
+# about 3 hours, so percentiles are within 1% without keeping every sample
+_LATENCY_BASE = 1.01
+_LATENCY_MIN_MS = 0.01
+_LATENCY_BUCKETS = 2100
+_READ_CHUNK = 1 << 20
+
+
+class ConversationLog:
+    """
+    Bounded queue plus background writer for conversation records.
+
+    `record` never blocks: once `max_queue` records are waiting it drops the new one
+    and counts it in `dropped`. The writer wakes every `flush_interval` seconds, or
+    as soon as `batch_size` records are waiting, and writes everything queued as one
+    compressed block. Each block is flushed to the file, so a crash loses at most
+    the records still in the queue and readers can follow the active segment.
+    A segment is closed and a new one started once it reaches `segment_bytes`.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024,
+                 max_queue: int = 10000, batch_size: int = 512, flush_interval: float = 1.0,
+                 level: int = 3):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self.segments = 0
+        self._queue: Deque[tuple] = deque()
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._file = None
+        self._stream = None
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def record(self, endpoint: str, hospital: str, session_id: Optional[str], message: str,
+               intent: str, topic: str, answered: bool, data_version: str, seconds: float):
+        """Queues one chat result. Safe to call from the event loop and from any thread."""
+        # Deque appends are atomic; the length check may overshoot by a record or two
+        # under contention, which is fine for a memory bound
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        # A plain tuple in FIELDS order; the writer thread turns it into JSON
+        self._queue.append((time.time(), endpoint, hospital, session_id, message[:MAX_MESSAGE_CHARS],
+                            intent, topic, answered, data_version, seconds))
+        if len(self._queue) >= self.batch_size:
+            self._wake.set()
+
+    def start(self):
+        if self._writer is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._stopping.clear()
+        self._writer = threading.Thread(target=self._run, name="conversation-log-writer", daemon=True)
+        self._writer.start()
+
+    def stop(self):
+        """Writes out whatever is queued and closes the current segment."""
+        if self._writer is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._writer.join()
+        self._writer = None
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            stopping = self._stopping.is_set()
+            self.flush()
+            if stopping:
+                self._close_segment()
+                return
+
+    def flush(self):
+        """Writes every queued record. Called by the writer thread; scripts may call it directly."""
+        while self._queue:
+            batch = []
+            while self._queue and len(batch) < self.batch_size * 4:
+                batch.append(self._queue.popleft())
+            try:
+                self._write(batch)
+            except Exception:
+                # A full or unwritable disk must not take down the server; the batch is
+                # lost and counted, and the next batch starts a fresh segment
+                self.write_errors += 1
+                self.dropped += len(batch)
+                traceback.print_exc()
+                self._close_segment()
+
+    def _write(self, batch: List[tuple]):
+        if self._stream is None:
+            self._open_segment()
+        payload = "".join(json.dumps(_as_dict(r), ensure_ascii=False, separators=(",", ":")) + "\n" for r in batch)
+        self._stream.write(payload.encode("utf-8"))
+        self._stream.flush(zstandard.FLUSH_BLOCK)
+        self._file.flush()
+        self.written += len(batch)
+        if self._file.tell() >= self.segment_bytes:
+            self._close_segment()
+
+    def _open_segment(self):
+        # Sortable by creation time; the counter keeps names unique within a second
+        self._seq += 1
+        name = f"conversations-{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}-{os.getpid()}-{self._seq:04d}{SEGMENT_SUFFIX}"
+        self._file = open(os.path.join(self.directory, name), "xb")
+        self._stream = self._compressor.stream_writer(self._file, closefd=False)
+        self.segments += 1
+
+    def _close_segment(self):
+        stream, file = self._stream, self._file
+        self._stream = self._file = None
+        try:
+            if stream is not None:
+                stream.flush(zstandard.FLUSH_FRAME)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            if file is not None:
+                file.close()
+
+
+def _as_dict(queued: tuple) -> Dict:
+    record = dict(zip(FIELDS, queued))
+    record["latency_ms"] = round(record["latency_ms"] * 1e3, 3)
+    return record
+
+
+def segment_paths(paths: Iterable[str]) -> List[str]:
+    """Expands directories into their segment files, oldest first."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(sorted(glob.glob(os.path.join(path, "*" + SEGMENT_SUFFIX))))
+        else:
+            found.append(path)
+    return found
+
+
+def iter_records(paths: Iterable[str]) -> Iterator[Dict]:
+    """
+    Yields the records of each segment in order, decompressing a chunk at a time.
+    A partial last line, as in a segment still being written or cut short by a
+    crash, is skipped.
+    """
+    decompressor = zstandard.ZstdDecompressor()
+    for path in segment_paths(paths):
+        with open(path, "rb") as f:
+            reader = decompressor.stream_reader(f, read_across_frames=True)
+            tail = b""
+            while True:
+                chunk = reader.read(_READ_CHUNK)
+                if not chunk:
+                    break
+                lines = (tail + chunk).split(b"\n")
+                tail = lines.pop()
+                for line in lines:
+                    if line:
+                        yield json.loads(line)
+            if tail:
+                try:
+                    yield json.loads(tail)
+                except ValueError:
+                    pass
+
+
+class LatencyHistogram:
+    """Counts latencies in log-spaced buckets; percentiles are accurate to about 1%."""
+
+    def __init__(self):
+        self.counts = np.zeros(_LATENCY_BUCKETS, dtype=np.int64)
+        self.total = 0
+
+    def add(self, ms: float):
+        bucket = 0 if ms <= _LATENCY_MIN_MS else int(math.log(ms / _LATENCY_MIN_MS, _LATENCY_BASE)) + 1
+        self.counts[min(bucket, _LATENCY_BUCKETS - 1)] += 1
+        self.total += 1
+
+    def percentile(self, q: float) -> float:
+        if not self.total:
+            return 0.0
+        bucket = int(np.searchsorted(np.cumsum(self.counts), math.ceil(q / 100 * self.total)))
+        # Upper edge of the bucket
+        return round(_LATENCY_MIN_MS * _LATENCY_BASE ** bucket, 3)
+
+    def summary(self) -> Dict[str, float]:
+        return {"count": self.total, **{f"p{q}_ms": self.percentile(q) for q in (50, 90, 95, 99)}}
+
+
+class _TopMessages:
+    """
+    Approximate most frequent messages in bounded memory: when more than
+    2 * `capacity` distinct messages are tracked, the rarest half is forgotten.
+    Counts of messages that stay popular are exact or close to it.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.counts: Counter = Counter()
+
+    def add(self, message: str):
+        self.counts[message] += 1
+        if len(self.counts) > 2 * self.capacity:
+            self.counts = Counter(dict(self.counts.most_common(self.capacity)))
+
+    def most_common(self, n: int):
+        return self.counts.most_common(n)
+
+
+def _normalize(message: str) -> str:
+    return " ".join(message.lower().split())
+
+
+def summarize(records: Iterable[Dict], top: int = 10) -> Dict:
+    """Intent mix, refusals, unanswered queries and latency percentiles of `records`."""
+    total = 0
+    intents: Counter = Counter()
+    hospitals: Counter = Counter()
+    unanswered = 0
+    top_unanswered = _TopMessages(capacity=max(1000, top * 10))
+    latency = LatencyHistogram()
+    by_endpoint: Dict[str, LatencyHistogram] = {}
+    first = last = None
+    for r in records:
+        total += 1
+        intents[r["intent"]] += 1
+        hospitals[r["hospital"]] += 1
+        if r["intent"] == HOSPITAL_INTENT and not r["answered"]:
+            unanswered += 1
+            top_unanswered.add(_normalize(r["message"]))
+        latency.add(r["latency_ms"])
+        endpoint = by_endpoint.get(r["endpoint"])
+        if endpoint is None:
+            endpoint = by_endpoint[r["endpoint"]] = LatencyHistogram()
+        endpoint.add(r["latency_ms"])
+        first = r["ts"] if first is None else min(first, r["ts"])
+        last = r["ts"] if last is None else max(last, r["ts"])
+
+    return {
+        "records": total,
+        "first_ts": first,
+        "last_ts": last,
+        "hospitals": dict(hospitals.most_common()),
+        "intents": {intent: {"count": n, "share": round(n / total, 4)} for intent, n in intents.most_common()},
+        "refusals": intents[MEDICAL_INTENT],
+        "unanswered": {
+            "count": unanswered,
+            "rate": round(unanswered / total, 4) if total else 0.0,
+            "top": [{"message": m, "count": n} for m, n in top_unanswered.most_common(top)],
+        },
+        "latency": latency.summary(),
+        "latency_by_endpoint": {name: h.summary() for name, h in sorted(by_endpoint.items())},
+    }
+
+
+def _print_report(report: Dict):
+    def when(ts):
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)) if ts else "-"
+
+    print(f"{report['records']} conversations from {when(report['first_ts'])} to {when(report['last_ts'])}")
+    print("\nIntent mix")
+    for intent, entry in report["intents"].items():
+        print(f"  {intent:<16} {entry['count']:>9} {entry['share']:>7.1%}")
+    print(f"  medical refusals {report['refusals']:>9}")
+    unanswered = report["unanswered"]
+    print(f"\nUnanswered hospital questions: {unanswered['count']} ({unanswered['rate']:.1%})")
+    for entry in unanswered["top"]:
+        print(f"  {entry['count']:>7}  {entry['message'][:100]}")
+    print("\nLatency (ms)")
+    rows = [("all", report["latency"])] + list(report["latency_by_endpoint"].items())
+    for name, s in rows:
+        print(f"  {name:<12} n={s['count']:<9} p50 {s['p50_ms']:>8.2f}  p90 {s['p90_ms']:>8.2f}  "
+              f"p95 {s['p95_ms']:>8.2f}  p99 {s['p99_ms']:>8.2f}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Summarize conversation log segments")
+    parser.add_argument("paths", nargs="+", help="Segment files or directories of segments")
+    parser.add_argument("--hospital", help="Only count conversations with this hospital")
+    parser.add_argument("--top", type=int, default=10, help="Unanswered questions to list")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if not segment_paths(args.paths):
+        sys.exit("no conversation log segments found")
+    records = iter_records(args.paths)
+    if args.hospital:
+        records = (r for r in records if r["hospital"] == args.hospital)
+    report = summarize(records, top=args.top)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Words that introduce a doctor's name in a question
+_NAME_MARKERS = {"dr", "doctor", "doc"}
+
+# Tokens that can follow a marker without being part of a name ("is a doctor in on ...")
+_STOPWORDS = {"a", "an", "the", "is", "in", "on", "at", "for", "available", "today",
+              "tomorrow", "this", "next", "who", "when", "where", "and", "or", "s"}
+
+# Minimum trigram similarity for a fuzzy name match
+_FUZZY_THRESHOLD = 0.35
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+def _name_tokens(name: str) -> List[str]:
+    return [t for t in _tokens(name) if t not in _NAME_MARKERS]
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _stem(token: str) -> str:
+    # Just enough to fold plurals: "pediatricians" -> "pediatrician"
+    return token[:-1] if len(token) > 4 and token.endswith("s") else token
+
+class DirectoryMatch(NamedTuple):
+    doctors: List[Dict]
+    departments: List[Dict]
+    matched_by: str
+    # Positions of `doctors` in the roster, for looking up per-doctor data
+    doctor_ids: List[int] = []
+
+class DirectoryIndex:
+    """
+    Lookup structures over the doctor and department directory, built once per
+    data snapshot so that answering a question never scans the roster.
+
+    - name token -> doctors, with a sorted token list for prefix search
+    - name trigram -> name tokens, for typo-tolerant fallback matching
+    - specialty word -> doctors
+    - department word -> departments (name, head, location)
+    """
+
+    def __init__(self, doctors: List[Dict], departments: List[Dict]):
+        self.doctors = doctors
+        self.departments = departments
+
+        by_token = defaultdict(list)
+        by_specialty = defaultdict(list)
+        for i, doc in enumerate(doctors):
+            for token in set(_name_tokens(doc["name"])):
+                by_token[token].append(i)
+            for word in _tokens(doc["specialty"]):
+                by_specialty[_stem(word)].append(i)
+
+        # Trigrams index the distinct name tokens, which are far fewer than doctors
+        self._sorted_tokens: List[str] = sorted(by_token)
+        by_trigram = defaultdict(list)
+        self._trigram_counts: List[int] = []
+        for t, token in enumerate(self._sorted_tokens):
+            grams = _trigrams(token)
+            for gram in grams:
+                by_trigram[gram].append(t)
+            self._trigram_counts.append(len(grams))
+
+        by_department = defaultdict(list)
+        for i, dept in enumerate(departments):
+            for word in _tokens(dept["name"]):
+                by_department[_stem(word)].append(i)
+
+        self._by_token: Dict[str, List[int]] = dict(by_token)
+        self._by_trigram: Dict[str, List[int]] = dict(by_trigram)
+        self._by_specialty: Dict[str, List[int]] = dict(by_specialty)
+        self._by_department: Dict[str, List[int]] = dict(by_department)
+
+    def _prefix_ids(self, prefix: str) -> set:
+        ids = set()
+        tokens = self._sorted_tokens
+        i = bisect_left(tokens, prefix)
+        while i < len(tokens) and tokens[i].startswith(prefix):
+            ids.update(self._by_token[tokens[i]])
+            i += 1
+        return ids
+
+    def _fuzzy_ids(self, tokens: List[str], limit: int) -> List[int]:
+        # Each query token votes for doctors by its best-matching name token
+        doc_scores = defaultdict(float)
+        for token in tokens:
+            grams = _trigrams(token)
+            shared = defaultdict(int)
+            for gram in grams:
+                for t in self._by_trigram.get(gram, ()):
+                    shared[t] += 1
+            best = {}
+            for t, n_shared in shared.items():
+                score = n_shared / (len(grams) + self._trigram_counts[t] - n_shared)
+                if score < _FUZZY_THRESHOLD:
+                    continue
+                for i in self._by_token[self._sorted_tokens[t]]:
+                    best[i] = max(best.get(i, 0.0), score)
+            for i, score in best.items():
+                doc_scores[i] += score
+        ranked = sorted(doc_scores.items(), key=lambda item: (-item[1], item[0]))
+        return [i for i, _ in ranked[:limit]]
+
+    def find_doctors(self, name_query: str, limit: int = 5) -> List[Dict]:
+        return [self.doctors[i] for i in self.find_doctor_ids(name_query, limit)]
+
+    def find_doctor_ids(self, name_query: str, limit: int = 5) -> List[int]:
+        """
+        Doctors whose name tokens start with every token of `name_query`, falling
+        back to trigram similarity when no name matches exactly (e.g. typos).
+        """
+        tokens = _name_tokens(name_query)
+        if not tokens:
+            return []
+        ids: Optional[set] = None
+        for token in tokens:
+            matches = self._prefix_ids(token)
+            if ids is not None and not matches & ids:
+                # Extra words after a complete name ("Dr. Heart friday") don't discard it
+                break
+            ids = matches if ids is None else ids & matches
+            if not ids:
+                break
+        if ids:
+            return sorted(ids)[:limit]
+        return self._fuzzy_ids(tokens, limit)
+
+    def match_message(self, message: str, limit: int = 5) -> Optional[DirectoryMatch]:
+        """
+        Finds the doctors or departments a free-text question is about, if any.
+        """
+        tokens = _tokens(message)
+
+        # "Dr. Heart", "doctor bone setter": look up the words after the marker
+        for pos, token in enumerate(tokens):
+            if token not in _NAME_MARKERS:
+                continue
+            name = [t for t in tokens[pos + 1:pos + 4] if t not in _STOPWORDS]
+            if name:
+                ids = self.find_doctor_ids(" ".join(name), limit)
+                if ids:
+                    return DirectoryMatch([self.doctors[i] for i in ids], [], "name", ids)
+
+        # Departments before specialties: "orthopedics" names a department even
+        # though it also folds onto the "Orthopedic Surgeon" specialty
+        for token in tokens:
+            ids = self._by_department.get(_stem(token))
+            if ids:
+                return DirectoryMatch([], [self.departments[i] for i in ids[:limit]], "department")
+
+        for token in tokens:
+            ids = self._by_specialty.get(_stem(token))
+            if ids:
+                ids = ids[:limit]
+                return DirectoryMatch([self.doctors[i] for i in ids], [], "specialty", ids)
+        return None
@@ -1,31 +1,53 @@
-from typing import TypedDict, Literal, List
+import datetime
+import os
+import re
+from typing import Any, TypedDict, Literal, List, Optional, Tuple, Union
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
-from .hospital_data import hospital_data, HospitalData
+from .hospital_data import hospital_data, HospitalSnapshot
+from .intents import intent_matcher
+from .classifier import build_guardian
+from .fast_path import compile_fast_path
+from .metrics import timed_node
+from .schedule import DAY_NAMES, format_minute
 
 # Define State
 class AgentState(TypedDict):
     messages: List[str]
     current_intent: str
+    topic: str
     response: str
+    data_version: str
+    # False when the bot had nothing to offer but its generic help text, or refused
+    answered: bool
+    # HospitalSnapshot of the hospital being asked about, pinned for the whole run
+    hospital: Any
+
+def _snapshot(state: AgentState) -> HospitalSnapshot:
+    # Callers that don't pick a hospital (scripts, benchmarks) get the default one
+    return state.get("hospital") or hospital_data.snapshot
+
+# "keyword" flags medical questions by the keyword table alone; "linear" lets the
+# hashed n-gram model decide, and the keyword rule still supplies the topic
+GUARDIAN_ENGINE = os.environ.get("HOSPIBOT_GUARDIAN_ENGINE", "keyword")
+
+# Model probability at or above which the linear engine treats a message as medical
+GUARDIAN_THRESHOLD = float(os.environ.get("HOSPIBOT_GUARDIAN_THRESHOLD", "0.5"))
+
+guardian = build_guardian(GUARDIAN_ENGINE, GUARDIAN_THRESHOLD)
 
 # --- Nodes ---
 
+@timed_node("guardian")
 def guardian_node(state: AgentState):
     """
     Analyzes the latest message to determine if it's medical or hospital-related.
     """
-    last_message = state['messages'][-1].lower()
-    
-    # RISK: Basic keyword matching. In production, utilize an LLM guardrail here.
-    medical_keywords = ["pain", "symptom", "hurt", "dose", "pill", 
-                       "headache", "fever", "diagnosis", "bleed", "broken", 
-                       "itch", "swelling", "burn", "infection", "virus"]
-    
-    if any(word in last_message for word in medical_keywords):
-        return {"current_intent": "medical"}
-    
-    return {"current_intent": "hospital_info"}
+    # RISK: Keyword matching or a small local model. In production, utilize an LLM guardrail here.
+    intent, topic = guardian.classify(state['messages'][-1])
+    return {"current_intent": intent, "topic": topic or ""}
 
+@timed_node("medical_refusal")
 def medical_refusal_node(state: AgentState):
     """
     Returns a strict refusal for medical queries.
@@ -33,35 +55,183 @@ def medical_refusal_node(state: AgentState):
     refusal_msg = ("I am not a doctor and I cannot provide medical advice, diagnosis, or treatment. "
                    "If you are experiencing a medical emergency, please call emergency services immediately "
                    "or visit the nearest Emergency Room. Would you like to speak to a hospital representative?")
-    return {"response": refusal_msg}
+    return {"response": refusal_msg, "data_version": _snapshot(state).version, "answered": False}
+
+# --- Schedule helpers ---
+
+_DAY_WORDS = {**{d.lower(): i for i, d in enumerate(DAY_NAMES)}, **{d[:3].lower(): i for i, d in enumerate(DAY_NAMES)}}
+
+def _requested_time(message: str, now: datetime.datetime) -> Optional[Tuple[str, int, Optional[datetime.datetime]]]:
+    """
+    Finds the time a question asks about, as (label, weekday, moment). `moment` is
+    set for "now" questions and None when the question is about a whole day.
+    """
+    for word in re.findall(r"[a-z]+", message.lower()):
+        if word in _DAY_WORDS:
+            day = _DAY_WORDS[word]
+            return f"on {DAY_NAMES[day]}", day, None
+        if word == "today":
+            return "today", now.weekday(), None
+        if word == "tomorrow":
+            return "tomorrow", (now.weekday() + 1) % 7, None
+        if word in ("now", "currently"):
+            return "right now", now.weekday(), now
+    return None
+
+def _format_hours(hours: List[Tuple[int, int]]) -> str:
+    return ", ".join(f"{format_minute(start)} - {format_minute(end)}" for start, end in hours)
+
+def _doctor_availability(data, doctor_ids: List[int], when, now: datetime.datetime) -> str:
+    label, day, moment = when
+    lines = []
+    for i in doctor_ids:
+        doc, schedule = data.data["doctors"][i], data.doctor_schedules[i]
+        if schedule is None:
+            lines.append(f"- {doc['name']} ({doc['specialty']}): {doc['availability']}")
+        elif moment is not None:
+            change = schedule.next_change(moment)
+            if schedule.is_open(moment):
+                lines.append(f"- Yes, {doc['name']} is in {label}, until {format_minute(change.hour * 60 + change.minute)}.")
+            else:
+                when_next = f"{DAY_NAMES[change.weekday()]} at {format_minute(change.hour * 60 + change.minute)}" if change else "not scheduled"
+                lines.append(f"- No, {doc['name']} is not in {label}. Next in: {when_next}.")
+        else:
+            hours = schedule.hours_on(day)
+            if hours:
+                lines.append(f"- Yes, {doc['name']} is in {label}: {_format_hours(hours)}.")
+            else:
+                lines.append(f"- No, {doc['name']} is not in {label}. Usual schedule: {doc['availability']}.")
+    return "\n".join(lines)
+
+# "Who is in on Friday?", "Is anyone around now?": asks about the roster as a whole
+# when the guardian found no topic. It has to ask about people, and "in" only counts
+# right before a time, so "Any parking available?" and "who is in charge" don't match
+_ROSTER_QUESTION_RE = re.compile(r"\b(who|any(one|body)|some(one|body))\b.*"
+                                 r"\b(available|working|on duty|on call|scheduled|around"
+                                 r"|in (on|today|tonight|tomorrow|now|at|this|next))\b")
+
+# Doctors listed by name in a roster answer before the rest are summarized
+_ROSTER_LIMIT = 10
 
+def _roster_availability(data, when) -> str:
+    label, day, moment = when
+    doctors = data.data["doctors"]
+    if moment is not None:
+        ids = data.roster.available_at(moment).tolist()
+        lines = [f"- {doctors[i]['name']} ({doctors[i]['specialty']})" for i in ids[:_ROSTER_LIMIT]]
+    else:
+        ids = data.doctors_available_on(day)
+        lines = [f"- {doctors[i]['name']} ({doctors[i]['specialty']}): "
+                 f"{_format_hours(data.doctor_schedules[i].hours_on(day))}" for i in ids[:_ROSTER_LIMIT]]
+    if not ids:
+        return f"No doctors are scheduled {label}.\nOur Medical Specialists:\n{data.get_doctors()}"
+    if len(ids) > _ROSTER_LIMIT:
+        lines.append(f"- ...and {len(ids) - _ROSTER_LIMIT} more")
+    return f"Doctors available {label}:\n" + "\n".join(lines)
+
+def _visiting_status_line(data, now: datetime.datetime) -> str:
+    status = data.get_visiting_status(now)
+    if not status["known"]:
+        return ""
+    day = "" if status["next_change_day"] == DAY_NAMES[now.weekday()] else f"{status['next_change_day']} "
+    if status["open"]:
+        return f"Visiting is open now, until {day}{status['next_change']}.\n"
+    return f"Visiting is closed now; the next window opens {day}at {status['next_change']}.\n"
+
+# Minimum cosine similarity for a retrieved fact to count as an answer, and the
+# fraction of the best hit's score that further facts need to be shown alongside it
+RETRIEVAL_MIN_SCORE = 0.2
+RETRIEVAL_RELATIVE_SCORE = 0.5
+
+def _retrieved_facts(data, message: str) -> str:
+    hits = data.retrieval.search(message, k=3, min_score=RETRIEVAL_MIN_SCORE)
+    lines, seen = [], set()
+    for hit in hits:
+        if hit.score < hits[0].score * RETRIEVAL_RELATIVE_SCORE:
+            break
+        # The same value can sit under two keys (e.g. emergency_contact and contacts.emergency)
+        value = hit.fact.text.split(": ", 1)[-1]
+        if value not in seen:
+            seen.add(value)
+            lines.append(f"- {hit.fact.text}")
+    return "\n".join(lines)
+
+@timed_node("hospital_expert")
 def hospital_expert_node(state: AgentState):
     """
-    Retrieves hospital information based on keywords.
+    Retrieves hospital information for the topic picked by the guardian.
     """
-    last_message = state['messages'][-1].lower()
+    topic = state.get("topic")
+    if topic is None:
+        topic = intent_matcher.classify(state['messages'][-1]).topic or ""
+    data = _snapshot(state)
     response = ""
+    answered = True
+
+    # Questions naming a doctor, specialty or department get a targeted answer
+    # from the directory index instead of the full roster
+    match = None
+    if topic in ("", "doctors", "departments", "location", "visiting_hours"):
+        match = data.directory.match_message(state['messages'][-1])
+        if match and match.departments and topic == "visiting_hours":
+            match = None
     
-    if "hour" in last_message or "time" in last_message or "visit" in last_message:
-        response = f"Visiting Hours information:\n{hospital_data.get_general_info()}"
-    elif "bill" in last_message or "pay" in last_message or "insurance" in last_message or "cost" in last_message:
-        response = f"Billing & Insurance:\n{hospital_data.get_billing_info()}"
-    elif "doctor" in last_message or "specialist" in last_message or "schedule" in last_message:
-        response = f"Our Medical Specialists:\n{hospital_data.get_doctors()}"
-    elif "depart" in last_message or "ward" in last_message:
-        response = f"Departments:\n{hospital_data.get_departments()}"
-    elif "where" in last_message or "location" in last_message or "address" in last_message:
-        response = f"Location:\n{hospital_data.get_general_info()}"
-    elif "human" in last_message or "representative" in last_message or "agent" in last_message or "yes" in last_message or "call" in last_message or "speak" in last_message:
+    roster_question = topic == "doctors" or (topic == "" and _ROSTER_QUESTION_RE.search(state['messages'][-1].lower()) is not None)
+    now = datetime.datetime.now()
+    when = _requested_time(state['messages'][-1], now) if topic == "" or roster_question or match else None
+
+    if match and match.doctors and when:
+        response = f"Here is who I found:\n{_doctor_availability(data, match.doctor_ids, when, now)}"
+    elif match and match.doctors:
+        lines = "\n".join(f"- {d['name']} ({d['specialty']}): {d['availability']}" for d in match.doctors)
+        response = f"Here is who I found:\n{lines}"
+    elif match and match.departments:
+        lines = "\n".join(f"- {d['name']}: {d['location']}" + (f" (Head: {d['head']})" if d.get('head') else "")
+                           for d in match.departments)
+        response = f"Departments:\n{lines}"
+    elif when and roster_question:
+        response = _roster_availability(data, when)
+    elif topic == "visiting_hours":
+        response = f"Visiting Hours information:\n{_visiting_status_line(data, now)}{data.get_general_info()}"
+    elif topic == "billing":
+        response = f"Billing & Insurance:\n{data.get_billing_info()}"
+    elif topic == "doctors":
+        response = f"Our Medical Specialists:\n{data.get_doctors()}"
+    elif topic == "departments":
+        response = f"Departments:\n{data.get_departments()}"
+    elif topic == "location":
+        facts = _retrieved_facts(data, state['messages'][-1])
+        response = f"Here is what I found:\n{facts}" if facts else f"Location:\n{data.get_general_info()}"
+    elif topic == "human":
         response = ("I have connected you to our Pattern Representative.\n\n"
                     "👤 **Name**: Jane Doe\n"
                     "📞 **Phone**: 555-0123\n\n"
                     "She is available 24/7 to assist you with your query.")
     else:
-        response = ("I can help with Visiting Hours, Doctor Schedules, Billing, or Departments. "
-                    "How can I assist you with hospital information?")
+        # Nothing in the keyword chain matched; look for individual facts before giving up
+        facts = _retrieved_facts(data, state['messages'][-1])
+        if facts:
+            response = f"Here is what I found:\n{facts}"
+        else:
+            answered = False
+            response = ("I can help with Visiting Hours, Doctor Schedules, Billing, or Departments. "
+                        "How can I assist you with hospital information?")
         
-    return {"response": response}
+    return {"response": response, "data_version": data.version, "answered": answered}
+
+# --- Async variants ---
+# The nodes are pure in-memory lookups, so the async variants run them inline on the
+# event loop instead of paying a thread-pool hop per node. Any node that gains real
+# I/O should get a genuinely awaiting implementation here.
+
+async def aguardian_node(state: AgentState):
+    return guardian_node(state)
+
+async def amedical_refusal_node(state: AgentState):
+    return medical_refusal_node(state)
+
+async def ahospital_expert_node(state: AgentState):
+    return hospital_expert_node(state)
 
 # --- Edges ---
 
@@ -70,13 +240,34 @@ def route_intent(state: AgentState) -> Literal["medical_refusal", "hospital_expe
         return "medical_refusal"
     return "hospital_expert"
 
+# --- Batch execution ---
+
+def run_batch(states: List[AgentState]) -> List[Union[AgentState, Exception]]:
+    """
+    Classifies a whole batch with one guardian pass, then fans each state out to the
+    node `route_intent` picks. Gives the same results as invoking the graph per state;
+    an item whose node raises gets the exception in its slot instead of failing the batch.
+    """
+    verdicts = guardian.classify_many(s['messages'][-1] for s in states)
+    nodes = {"medical_refusal": medical_refusal_node, "hospital_expert": hospital_expert_node}
+    results: List[Union[AgentState, Exception]] = []
+    for state, (intent, topic) in zip(states, verdicts):
+        state = {**state, "current_intent": intent, "topic": topic or ""}
+        try:
+            state.update(nodes[route_intent(state)](state))
+            results.append(state)
+        except Exception as e:
+            results.append(e)
+    return results
+
 # --- Graph Contruction ---
 
 workflow = StateGraph(AgentState)
 
-workflow.add_node("guardian", guardian_node)
-workflow.add_node("medical_refusal", medical_refusal_node)
-workflow.add_node("hospital_expert", hospital_expert_node)
+# Each node carries both variants: `invoke` runs the sync one, `ainvoke` the async one.
+workflow.add_node("guardian", RunnableLambda(guardian_node, afunc=aguardian_node, name="guardian"))
+workflow.add_node("medical_refusal", RunnableLambda(medical_refusal_node, afunc=amedical_refusal_node, name="medical_refusal"))
+workflow.add_node("hospital_expert", RunnableLambda(hospital_expert_node, afunc=ahospital_expert_node, name="hospital_expert"))
 
 workflow.set_entry_point("guardian")
 
@@ -89,3 +280,11 @@ workflow.add_edge("medical_refusal", END)
 workflow.add_edge("hospital_expert", END)
 
 app = workflow.compile()
+
+# Direct-call equivalent of `app` for its fixed guardian -> refusal/expert topology.
+# None if the graph above ever stops matching that shape.
+fast_app = compile_fast_path(app, route_intent, {
+    "guardian": guardian_node,
+    "medical_refusal": medical_refusal_node,
+    "hospital_expert": hospital_expert_node,
+})
@@ -1,46 +1,334 @@
+import datetime
+import hashlib
 import json
 import os
+import threading
+import traceback
 from typing import List, Dict, Optional
 
+from .binary_snapshot import load_snapshot, snapshot_path_for
+from .directory import DirectoryIndex
+from .retrieval import RetrievalIndex
+from .schedule import RosterAvailability, WeeklySchedule, format_minute, try_parse, DAY_NAMES
+
 # Define the path relative to this file
 DATA_FILE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "hospital_info.json")
 
-class HospitalData:
-    def __init__(self):
-        self.data = self._load_data()
+# Sections whose rendering depends only on the data file, never on the query
+RENDERED_SECTIONS = ("general_info", "departments", "doctors", "billing_info")
 
-    def _load_data(self) -> Dict:
-        try:
-            with open(DATA_FILE_PATH, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print(f"Error: Data file not found at {DATA_FILE_PATH}")
-            return {}
+def validate_hospital_data(data) -> None:
+    """
+    Raises ValueError if `data` does not have the shape the nodes rely on.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("top level must be an object")
+    general_info = data.get("general_info", {})
+    if not isinstance(general_info, dict):
+        raise ValueError("general_info must be an object")
+    if not isinstance(general_info.get("visiting_hours", ""), str):
+        raise ValueError("general_info.visiting_hours must be a string")
+    for section, fields in (("departments", ("name", "location")),
+                            ("doctors", ("name", "specialty", "availability"))):
+        entries = data.get(section, [])
+        if not isinstance(entries, list):
+            raise ValueError(f"{section} must be a list")
+        for i, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                raise ValueError(f"{section}[{i}] must be an object")
+            missing = [f for f in fields if not isinstance(entry.get(f), str)]
+            if missing:
+                raise ValueError(f"{section}[{i}] is missing {', '.join(missing)}")
+            if section == "departments" and not isinstance(entry.get("head") or "", str):
+                raise ValueError(f"{section}[{i}].head must be a string")
+    billing = data.get("billing", {})
+    if not isinstance(billing, dict):
+        raise ValueError("billing must be an object")
+    for key in ("insurance_accepted", "payment_methods"):
+        items = billing.get(key, [])
+        if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+            raise ValueError(f"billing.{key} must be a list of strings")
 
-    def get_general_info(self) -> str:
+class HospitalSnapshot:
+    """
+    One immutable, fully rendered version of the hospital data.
+
+    A request grabs a snapshot once and reads everything from it, so a reload that
+    lands mid-request never mixes two versions of the data in one answer.
+    """
+
+    def __init__(self, data: Dict, content_hash: str = "", mtime_ns: Optional[int] = None,
+                 previous: Optional["HospitalSnapshot"] = None, retrieval: Optional[RetrievalIndex] = None):
+        self.data = data
+        self.content_hash = content_hash
+        self.mtime_ns = mtime_ns
+        self.version = content_hash[:12] if content_hash else "empty"
+        self.directory = DirectoryIndex(data.get("doctors", []), data.get("departments", []))
+        # Schedules are parsed once here; None marks a string the parser couldn't read
+        self.visiting_schedule = try_parse(data.get("general_info", {}).get("visiting_hours"))
+        # Large rosters repeat a handful of availability strings, so each is parsed once
+        parsed: Dict[str, Optional[WeeklySchedule]] = {}
+        self.doctor_schedules = []
+        for doc in data.get("doctors", []):
+            text = doc["availability"]
+            if text not in parsed:
+                parsed[text] = try_parse(text)
+            self.doctor_schedules.append(parsed[text])
+        self.roster = RosterAvailability(self.doctor_schedules)
+        # Rebuilt from the previous snapshot's index, copying the rows of unchanged facts
+        self.retrieval = retrieval or RetrievalIndex.from_data(data, previous.retrieval if previous else None)
+        self._rendered = {
+            "general_info": self._render_general_info(),
+            "departments": self._render_departments(),
+            "doctors": self._render_doctors(),
+            "billing_info": self._render_billing_info(),
+        }
+        # Whole JSON response bodies for GET /sections/{section}, serialized once per snapshot
+        self._rendered_bytes = {
+            k: json.dumps({"section": k, "text": v, "data_version": self.version}).encode("utf-8")
+            for k, v in self._rendered.items()
+        }
+
+    @classmethod
+    def from_bytes(cls, raw: bytes, mtime_ns: Optional[int] = None,
+                   previous: Optional["HospitalSnapshot"] = None) -> "HospitalSnapshot":
+        data = json.loads(raw)
+        validate_hospital_data(data)
+        return cls(data, hashlib.sha256(raw).hexdigest(), mtime_ns, previous)
+
+    @classmethod
+    def from_compiled(cls, path: str, content_hash: str, mtime_ns: Optional[int] = None,
+                      previous: Optional["HospitalSnapshot"] = None) -> Optional["HospitalSnapshot"]:
+        """
+        The snapshot from the compiled file at `path` if it was built from JSON with
+        `content_hash`, else None. Compiled files were validated when they were built.
+        """
+        compiled = load_snapshot(path, content_hash)
+        if compiled is None:
+            return None
+        return cls(compiled.data, content_hash, mtime_ns, previous, compiled.retrieval)
+
+    def _render_general_info(self) -> str:
         info = self.data.get("general_info", {})
         return "\n".join([f"{k.replace('_', ' ').title()}: {v}" for k, v in info.items()])
 
-    def get_departments(self) -> str:
+    def _render_departments(self) -> str:
         depts = self.data.get("departments", [])
         return "\n".join([f"- {d['name']} ({d['location']})" for d in depts])
 
-    def get_doctors(self) -> str:
+    def _render_doctors(self) -> str:
         docs = self.data.get("doctors", [])
         return "\n".join([f"- {d['name']} ({d['specialty']}): {d['availability']}" for d in docs])
-    
+
+    def _render_billing_info(self) -> str:
+        billing = self.data.get("billing", {})
+        insurance = ", ".join(billing.get("insurance_accepted", []))
+        methods = ", ".join(billing.get("payment_methods", []))
+        return f"Insurance Accepted: {insurance}\nPayment Methods: {methods}"
+
+    def get_general_info(self) -> str:
+        return self._rendered["general_info"]
+
+    def get_departments(self) -> str:
+        return self._rendered["departments"]
+
+    def get_doctors(self) -> str:
+        return self._rendered["doctors"]
+
     def get_doctor_by_name(self, name_query: str) -> str:
-        docs = self.data.get("doctors", [])
-        matching_docs = [d for d in docs if name_query.lower() in d['name'].lower()]
+        matching_docs = self.directory.find_doctors(name_query)
         if not matching_docs:
             return "No doctor found with that name."
         return "\n".join([f"- {d['name']} ({d['specialty']}): {d['availability']}" for d in matching_docs])
 
     def get_billing_info(self) -> str:
-        billing = self.data.get("billing", {})
-        insurance = ", ".join(billing.get("insurance_accepted", []))
-        methods = ", ".join(billing.get("payment_methods", []))
-        return f"Insurance Accepted: {insurance}\nPayment Methods: {methods}"
+        return self._rendered["billing_info"]
+
+    def get_rendered_bytes(self, section: str) -> bytes:
+        """
+        Returns a cached section as a serialized JSON body,
+        e.g. b'{"section": "doctors", "text": "- Dr. ...", "data_version": "..."}'.
+        """
+        return self._rendered_bytes[section]
+
+    def doctors_available_at(self, when: datetime.datetime) -> List[Dict]:
+        docs = self.data.get("doctors", [])
+        return [docs[i] for i in self.roster.available_at(when)]
+
+    def doctors_available_on(self, weekday: int) -> List[int]:
+        """Indexes of the doctors with hours on `weekday`."""
+        return self.roster.available_on(weekday).tolist()
+
+    def get_visiting_status(self, when: datetime.datetime) -> Dict:
+        """
+        Whether visiting hours are open at `when` and when that next changes.
+        """
+        schedule = self.visiting_schedule
+        if schedule is None:
+            return {"known": False, "open": False, "next_change": None, "next_change_day": None}
+        change = schedule.next_change(when)
+        return {
+            "known": True,
+            "open": schedule.is_open(when),
+            "next_change": format_minute(change.hour * 60 + change.minute) if change else None,
+            "next_change_day": DAY_NAMES[change.weekday()] if change else None,
+        }
+
+class HospitalData:
+    """
+    Serves the current HospitalSnapshot and swaps in new ones when the data file changes.
+
+    Reloads parse, validate and render the new file completely before a single
+    reference assignment publishes it. If the new file is broken, the last good
+    snapshot stays live and the problem is kept in `last_error`.
+
+    When a compiled `.snap` file built from the current JSON sits next to it (see
+    app.binary_snapshot), the records are memory-mapped from it instead of parsed.
+    """
+
+    def __init__(self, path: str = DATA_FILE_PATH):
+        self.path = path
+        self.last_error: Optional[str] = None
+        self._snapshot = HospitalSnapshot({})
+        # mtime of the file behind the live snapshot. A rejected file doesn't set it,
+        # so one completed within the same mtime tick is still picked up; its hash
+        # is kept instead so the watcher doesn't re-parse it on every poll
+        self._seen_mtime_ns: Optional[int] = None
+        self._rejected_hash: Optional[str] = None
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self.reload()
+
+    @property
+    def snapshot(self) -> HospitalSnapshot:
+        return self._snapshot
+
+    @property
+    def data(self) -> Dict:
+        return self._snapshot.data
+
+    @property
+    def version(self) -> str:
+        return self._snapshot.version
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Loads the data file if it changed. Returns True if a new snapshot went live.
+        """
+        with self._reload_lock:
+            current = self._snapshot
+            try:
+                with open(self.path, 'rb') as f:
+                    mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+                    raw = f.read()
+            except FileNotFoundError:
+                self.last_error = f"Data file not found at {self.path}"
+                print(f"Error: {self.last_error}")
+                return False
+
+            # A touched file with unchanged content keeps the existing snapshot
+            content_hash = hashlib.sha256(raw).hexdigest()
+            if not force and content_hash == current.content_hash:
+                self._seen_mtime_ns = mtime_ns
+                self.last_error = None
+                return False
+            if not force and content_hash == self._rejected_hash:
+                return False
+            try:
+                snapshot = HospitalSnapshot.from_compiled(snapshot_path_for(self.path), content_hash,
+                                                          mtime_ns, previous=current) \
+                    or HospitalSnapshot.from_bytes(raw, mtime_ns, previous=current)
+            except ValueError as e:
+                # json.JSONDecodeError is a ValueError too
+                self.last_error = f"Rejected {self.path}: {e}"
+                print(f"Error: {self.last_error}; keeping data version {current.version}")
+                self._rejected_hash = content_hash
+                return False
+            except Exception as e:
+                # Anything validation missed fails here, while building the snapshot;
+                # the last good snapshot stays live all the same
+                self.last_error = f"Rejected {self.path}: {type(e).__name__}: {e}"
+                print(f"Error: {self.last_error}; keeping data version {current.version}")
+                self._rejected_hash = content_hash
+                return False
+
+            self._snapshot = snapshot
+            self._seen_mtime_ns = mtime_ns
+            self._rejected_hash = None
+            self.last_error = None
+            return True
+
+    def reload_if_changed(self) -> bool:
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime_ns == self._seen_mtime_ns:
+            return False
+        return self.reload()
+
+    def start_watcher(self, interval: float = 2.0):
+        """
+        Polls the data file's mtime from a background thread and reloads on change.
+        """
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+
+        def watch():
+            while not self._stop_watching.wait(interval):
+                # e.g. a PermissionError from stat; keep watching
+                try:
+                    self.reload_if_changed()
+                except Exception:
+                    traceback.print_exc()
+
+        self._watcher = threading.Thread(target=watch, name="hospital-data-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        if self._watcher is None:
+            return
+        self._stop_watching.set()
+        self._watcher.join()
+        self._watcher = None
+
+    # Convenience accessors that read whichever snapshot is live right now
+
+    def get_general_info(self) -> str:
+        return self._snapshot.get_general_info()
+
+    def get_departments(self) -> str:
+        return self._snapshot.get_departments()
+
+    def get_doctors(self) -> str:
+        return self._snapshot.get_doctors()
+
+    def get_doctor_by_name(self, name_query: str) -> str:
+        return self._snapshot.get_doctor_by_name(name_query)
+
+    def get_billing_info(self) -> str:
+        return self._snapshot.get_billing_info()
+
+    def get_rendered_bytes(self, section: str) -> bytes:
+        return self._snapshot.get_rendered_bytes(section)
+
+_default: Optional[HospitalData] = None
+_default_lock = threading.Lock()
+
+def default_hospital_data() -> HospitalData:
+    """The HospitalData for DATA_FILE_PATH, loaded once on first use."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = HospitalData()
+    return _default
 
-# Global instance for easy access
-hospital_data = HospitalData()
+def __getattr__(name: str):
+    # The global `hospital_data` is loaded on first access rather than at import,
+    # so importing this module (e.g. for HospitalData) reads no files
+    if name == "hospital_data":
+        return default_hospital_data()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,140 @@
+import json
+import os
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Keyword tables live next to the hospital data so they can be tuned without code changes
+KEYWORDS_FILE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "intent_keywords.json")
+
+MEDICAL_INTENT = "medical"
+HOSPITAL_INTENT = "hospital_info"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Sentinel rank meaning "no topic matched"
+_NO_TOPIC = 1 << 30
+
+
+class Classification(NamedTuple):
+    intent: str
+    topic: Optional[str]
+
+
+class IntentMatcher:
+    """
+    Classifies a message into a guardian verdict and a topic in a single pass.
+
+    Messages are tokenized on word boundaries once and every token (or phrase of
+    up to `max_phrase_len` tokens) is looked up in a hash table, so the cost per
+    message depends on the message length and not on the size of the keyword tables.
+
+    Single medical words match as prefixes of a token, so inflections and compounds
+    ("burning", "painkillers") are refused like the word itself. Each token costs one
+    binary search over the sorted stems.
+    """
+
+    def __init__(self, keyword_table: Dict):
+        self.topics: List[str] = []
+        # keyword/phrase -> (is_medical, best topic rank)
+        self._lookup: Dict[str, Tuple[bool, int]] = {}
+        self.max_phrase_len = 1
+
+        stems = set()
+        for word in keyword_table.get("medical", []):
+            tokens = _TOKEN_RE.findall(word.lower())
+            if len(tokens) == 1:
+                stems.add(tokens[0])
+            else:
+                self._add(word, medical=True, rank=_NO_TOPIC)
+        # Stems that extend a shorter stem are redundant. Without them no stem is a
+        # prefix of another, so the last stem sorting at or before a token is the
+        # only one that can be its prefix
+        self._medical_stems: List[str] = []
+        for stem in sorted(stems):
+            if not self._medical_stems or not stem.startswith(self._medical_stems[-1]):
+                self._medical_stems.append(stem)
+
+        # Emergency words don't change the verdict; they only mark urgent traffic
+        self._emergency = set()
+        self._emergency_phrase_len = 1
+        for word in keyword_table.get("emergency", []):
+            tokens = _TOKEN_RE.findall(word.lower())
+            if tokens:
+                self._emergency.add(" ".join(tokens))
+                self._emergency_phrase_len = max(self._emergency_phrase_len, len(tokens))
+
+        for rank, topic in enumerate(keyword_table.get("topics", [])):
+            self.topics.append(topic["name"])
+            for word in topic.get("keywords", []):
+                self._add(word, medical=False, rank=rank)
+
+    @classmethod
+    def from_file(cls, path: str = KEYWORDS_FILE_PATH) -> "IntentMatcher":
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def _add(self, phrase: str, medical: bool, rank: int):
+        tokens = _TOKEN_RE.findall(phrase.lower())
+        if not tokens:
+            return
+        key = " ".join(tokens)
+        was_medical, best_rank = self._lookup.get(key, (False, _NO_TOPIC))
+        self._lookup[key] = (was_medical or medical, min(best_rank, rank))
+        self.max_phrase_len = max(self.max_phrase_len, len(tokens))
+
+    def _is_medical_token(self, token: str) -> bool:
+        stems = self._medical_stems
+        i = bisect_right(stems, token)
+        return i > 0 and token.startswith(stems[i - 1])
+
+    def classify(self, message: str) -> Classification:
+        tokens = _TOKEN_RE.findall(message.lower())
+        lookup = self._lookup
+        is_medical = self._is_medical_token
+        best_rank = _NO_TOPIC
+
+        if self.max_phrase_len == 1:
+            for token in tokens:
+                if is_medical(token):
+                    return Classification(MEDICAL_INTENT, None)
+                hit = lookup.get(token)
+                if hit is None:
+                    continue
+                if hit[0]:
+                    return Classification(MEDICAL_INTENT, None)
+                if hit[1] < best_rank:
+                    best_rank = hit[1]
+        else:
+            n_tokens = len(tokens)
+            for i in range(n_tokens):
+                if is_medical(tokens[i]):
+                    return Classification(MEDICAL_INTENT, None)
+                for n in range(1, min(self.max_phrase_len, n_tokens - i) + 1):
+                    hit = lookup.get(" ".join(tokens[i:i + n]))
+                    if hit is None:
+                        continue
+                    if hit[0]:
+                        return Classification(MEDICAL_INTENT, None)
+                    if hit[1] < best_rank:
+                        best_rank = hit[1]
+
+        topic = self.topics[best_rank] if best_rank != _NO_TOPIC else None
+        return Classification(HOSPITAL_INTENT, topic)
+
+    def mentions_emergency(self, message: str) -> bool:
+        tokens = _TOKEN_RE.findall(message.lower())
+        emergency = self._emergency
+        for i in range(len(tokens)):
+            for n in range(1, min(self._emergency_phrase_len, len(tokens) - i) + 1):
+                if " ".join(tokens[i:i + n]) in emergency:
+                    return True
+        return False
+
+    def classify_many(self, messages: Iterable[str]) -> List[Classification]:
+        classify = self.classify
+        return [classify(m) for m in messages]
+
+
+# Built once at import and shared by every request
+intent_matcher = IntentMatcher.from_file()
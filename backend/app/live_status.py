@@ -0,0 +1,176 @@
+import hashlib
+import json
+import math
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Rolling aggregate windows (label, seconds). They end at each metric's latest sample,
+# so a snapshot only changes when an update arrives and its ETag stays valid until then.
+WINDOWS: Tuple[Tuple[str, float], ...] = (("15m", 900.0), ("1h", 3600.0), ("24h", 86400.0))
+
+DEPARTMENT_STATES = ("open", "busy", "closed")
+
+# Metric names become JSON keys on every dashboard, so they are kept short and plain
+_METRIC_RE = re.compile(r"^[a-z][a-z0-9_]{0,63}$")
+_MAX_DEPARTMENT_NAME = 64
+_MAX_NOTE = 200
+
+# Updates stamped further ahead than this are rejected as a feed with a broken clock
+_MAX_CLOCK_SKEW = 300.0
+
+
+class RingSeries:
+    """
+    The last `capacity` samples of one metric in two preallocated NumPy arrays,
+    overwritten oldest-first. Aggregates are computed when a sample arrives, so
+    reading them costs nothing.
+    """
+
+    __slots__ = ("times", "values", "count", "_next", "aggregates")
+
+    def __init__(self, capacity: int):
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.count = 0
+        self._next = 0
+        self.aggregates: Dict = {}
+
+    def push(self, timestamp: float, value: float):
+        self.times[self._next] = timestamp
+        self.values[self._next] = value
+        self._next = (self._next + 1) % len(self.times)
+        self.count = min(self.count + 1, len(self.times))
+        self.aggregates = self._aggregate()
+
+    def _aggregate(self) -> Dict:
+        times, values = self.times[:self.count], self.values[:self.count]
+        # Feeds may deliver late samples; "latest" is the newest by timestamp
+        newest = int(np.argmax(times))
+        end = times[newest]
+        windows = {}
+        for label, seconds in WINDOWS:
+            in_window = values[times > end - seconds]
+            windows[label] = {
+                "count": int(in_window.size),
+                "mean": round(float(in_window.mean()), 3),
+                "min": float(in_window.min()),
+                "max": float(in_window.max()),
+            }
+        return {"latest": float(values[newest]), "updated_at": float(end), "samples": self.count,
+                "windows": windows}
+
+
+class HospitalStatus:
+    """
+    Live status for one hospital: numeric time series (ER wait, ICU occupancy,
+    on-call staff, ...) and each department's state.
+
+    The serialized snapshot and its ETag are rebuilt on every update, so the many
+    dashboards polling it are served prebuilt bytes, or a 304 when nothing changed.
+    Meant for a single event loop; updates and reads happen on the loop thread.
+    """
+
+    def __init__(self, hospital_id: str, capacity: int = 2048, max_metrics: int = 64,
+                 max_departments: int = 256):
+        self.hospital_id = hospital_id
+        self.capacity = capacity
+        self.max_metrics = max_metrics
+        self.max_departments = max_departments
+        self.series: Dict[str, RingSeries] = {}
+        self.departments: Dict[str, Dict] = {}
+        self.updated_at: Optional[float] = None
+        self.body = b""
+        self.etag = ""
+        self._render()
+
+    def update(self, metrics: Dict[str, float], departments: Dict[str, Dict],
+               timestamp: Optional[float] = None):
+        """
+        Applies one pushed update; nothing is applied if any part is invalid.
+        `departments` maps a name to {"state": ..., "note": ...}. Raises ValueError.
+        """
+        now = time.time()
+        timestamp = now if timestamp is None else float(timestamp)
+        if not math.isfinite(timestamp) or timestamp > now + _MAX_CLOCK_SKEW:
+            raise ValueError("timestamp is in the future")
+
+        for name, value in metrics.items():
+            if not _METRIC_RE.match(name):
+                raise ValueError(f"invalid metric name {name!r}")
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or not math.isfinite(value):
+                raise ValueError(f"metric {name} must be a finite number")
+        new_metrics = len(set(metrics) - set(self.series))
+        if len(self.series) + new_metrics > self.max_metrics:
+            raise ValueError(f"at most {self.max_metrics} metrics per hospital")
+
+        for name, entry in departments.items():
+            if not name or len(name) > _MAX_DEPARTMENT_NAME:
+                raise ValueError(f"invalid department name {name!r}")
+            if entry.get("state") not in DEPARTMENT_STATES:
+                raise ValueError(f"department {name} state must be one of {', '.join(DEPARTMENT_STATES)}")
+            if len(entry.get("note") or "") > _MAX_NOTE:
+                raise ValueError(f"department {name} note is longer than {_MAX_NOTE} characters")
+        new_departments = len(set(departments) - set(self.departments))
+        if len(self.departments) + new_departments > self.max_departments:
+            raise ValueError(f"at most {self.max_departments} departments per hospital")
+
+        for name, value in metrics.items():
+            series = self.series.get(name)
+            if series is None:
+                series = self.series[name] = RingSeries(self.capacity)
+            series.push(timestamp, float(value))
+        for name, entry in departments.items():
+            self.departments[name] = {"state": entry["state"], "note": entry.get("note") or "",
+                                      "updated_at": timestamp}
+        self.updated_at = max(self.updated_at or timestamp, timestamp)
+        self._render()
+
+    def snapshot(self) -> Dict:
+        return {
+            "hospital": self.hospital_id,
+            "updated_at": self.updated_at,
+            "metrics": {name: series.aggregates for name, series in self.series.items()},
+            "departments": self.departments,
+        }
+
+    def _render(self):
+        self.body = json.dumps(self.snapshot(), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value names `etag` (weak comparison, as for GET)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates: Iterable[str] = (tag.strip() for tag in if_none_match.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+
+class StatusBoard:
+    """The HospitalStatus of every hospital that has received updates."""
+
+    def __init__(self, capacity: int = 2048, max_hospitals: int = 256):
+        self.capacity = capacity
+        self.max_hospitals = max_hospitals
+        self._hospitals: Dict[str, HospitalStatus] = {}
+
+    def get(self, hospital_id: str) -> HospitalStatus:
+        """The hospital's status, empty if no update arrived for it yet."""
+        status = self._hospitals.get(hospital_id)
+        return status if status is not None else HospitalStatus(hospital_id, self.capacity)
+
+    def for_update(self, hospital_id: str) -> HospitalStatus:
+        status = self._hospitals.get(hospital_id)
+        if status is None:
+            if len(self._hospitals) >= self.max_hospitals:
+                raise ValueError(f"at most {self.max_hospitals} hospitals have live status")
+            status = self._hospitals[hospital_id] = HospitalStatus(hospital_id, self.capacity)
+        return status
+
+    def hospitals(self) -> List[str]:
+        return list(self._hospitals)
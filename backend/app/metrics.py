@@ -0,0 +1,290 @@
+import functools
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets, from 10us to 10s
+LATENCY_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """
+    A cumulative-on-export latency histogram: observing is one bisect and two
+    additions. Updates are not locked; the nodes run on the event loop thread,
+    and a rare lost increment from another thread is acceptable for monitoring.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms keyed by metric name and label set, rendered in the
+    Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._gauges: Dict[str, Callable[[], List[Tuple[Labels, float]]]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1):
+        series = self._counters.setdefault(name, {})
+        series[labels] = series.get(labels, 0) + value
+
+    def histogram(self, name: str, labels: Labels = ()) -> Histogram:
+        series = self._histograms.setdefault(name, {})
+        hist = series.get(labels)
+        if hist is None:
+            hist = series[labels] = Histogram()
+        return hist
+
+    def observe(self, name: str, labels: Labels, value: float):
+        self.histogram(name, labels).observe(value)
+
+    def gauge(self, name: str, collect: Callable[[], List[Tuple[Labels, float]]]):
+        """Registers a gauge whose samples are read from `collect` at export time."""
+        self._gauges[name] = collect
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        def header(name: str, default_kind: str):
+            kind, help_text = self._help.get(name, (default_kind, ""))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for name, series in sorted(self._counters.items()):
+            header(name, "counter")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+        for name, series in sorted(self._histograms.items()):
+            header(name, "histogram")
+            for labels, hist in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    le = 'le="%g"' % bound
+                    lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+                le = 'le="+Inf"'
+                lines.append(f"{name}_bucket{_format_labels(labels, le)} {hist.count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {hist.sum:.9g}")
+                lines.append(f"{name}_count{_format_labels(labels)} {hist.count}")
+
+        for name, collect in sorted(self._gauges.items()):
+            header(name, "gauge")
+            for labels, value in collect():
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Shared by the graph nodes and the API
+metrics = MetricsRegistry()
+metrics.describe("hospibot_node_seconds", "histogram", "Time spent in each graph node")
+metrics.describe("hospibot_node_errors_total", "counter", "Exceptions raised by graph nodes")
+metrics.describe("hospibot_request_seconds", "histogram", "Graph run time per endpoint and resulting intent")
+metrics.describe("hospibot_intents_total", "counter", "Answered messages by intent and topic")
+metrics.describe("hospibot_refusals_total", "counter", "Messages refused as medical questions")
+metrics.describe("hospibot_errors_total", "counter", "Failed requests by endpoint and exception type")
+metrics.describe("hospibot_http_request_seconds", "histogram", "Whole HTTP request time, including parsing and serialization")
+
+
+def timed_node(name: str):
+    """
+    Decorator recording a graph node's run time in `hospibot_node_seconds` and
+    counting the exceptions it raises. Costs two clock reads and a bisect per call.
+    """
+    labels = (("node", name),)
+
+    def decorate(func):
+        hist = metrics.histogram("hospibot_node_seconds", labels)
+
+        @functools.wraps(func)
+        def wrapper(state):
+            start = time.perf_counter()
+            try:
+                return func(state)
+            except Exception as e:
+                metrics.inc("hospibot_node_errors_total", labels + (("type", type(e).__name__),))
+                raise
+            finally:
+                hist.observe(time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def record_result(endpoint: str, intent: str, topic: str, seconds: float):
+    metrics.observe("hospibot_request_seconds", (("endpoint", endpoint), ("intent", intent)), seconds)
+    metrics.inc("hospibot_intents_total", (("intent", intent), ("topic", topic)))
+    if intent == "medical":
+        metrics.inc("hospibot_refusals_total", (("endpoint", endpoint),))
+
+
+def record_error(endpoint: str, error: BaseException):
+    metrics.inc("hospibot_errors_total", (("endpoint", endpoint), ("type", type(error).__name__)))
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack every `interval` seconds from a background
+    thread and counts the collapsed stacks ("outer;inner;leaf"), the input format
+    of flamegraph tools. The profiled thread pays nothing beyond GIL hand-offs.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.001, max_depth: int = 64):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None and len(names) < self.max_depth:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="hospibot-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """The most recent per-request profiles, by ID."""
+
+    def __init__(self, capacity: int = 32):
+        self._profiles: Dict[str, Optional[str]] = {}
+        self._order: Deque[str] = deque()
+        self.capacity = capacity
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> str:
+        """Allocates an ID up front, so it can be sent before the profile is complete."""
+        with self._lock:
+            self._next_id += 1
+            profile_id = str(self._next_id)
+            self._profiles[profile_id] = None
+            self._order.append(profile_id)
+            while len(self._order) > self.capacity:
+                self._profiles.pop(self._order.popleft(), None)
+            return profile_id
+
+    def put(self, profile_id: str, collapsed: str):
+        with self._lock:
+            if profile_id in self._profiles:
+                self._profiles[profile_id] = collapsed
+
+    def get(self, profile_id: str) -> Optional[str]:
+        return self._profiles.get(profile_id)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request into `hospibot_http_request_seconds`,
+    so the gap to `hospibot_request_seconds` shows parsing and serialization cost.
+
+    A request carrying `X-HospiBot-Profile: 1` and the admin token is run under a
+    SamplingProfiler (never without a configured token, as each profile starts a
+    1 kHz sampling thread); the response's `X-Profile-Id`
+    header names the profile to fetch from `/admin/profile/{id}`. The sampler
+    watches the event loop thread, so requests running concurrently show up too.
+    """
+
+    def __init__(self, app, profiles: ProfileStore, admin_token: Optional[str] = None,
+                 profile_interval: float = 0.001):
+        self.app = app
+        self.profiles = profiles
+        self.admin_token = admin_token
+        self.profile_interval = profile_interval
+
+    def _wants_profile(self, scope) -> bool:
+        headers = dict(scope.get("headers") or ())
+        if headers.get(b"x-hospibot-profile") not in (b"1", b"true"):
+            return False
+        if not self.admin_token:
+            return False
+        return headers.get(b"x-admin-token", b"").decode("latin-1") == self.admin_token
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+        profiler = profile_id = None
+        if self._wants_profile(scope):
+            profile_id = self.profiles.reserve()
+            profiler = SamplingProfiler(interval=self.profile_interval).start()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile_id is not None:
+                    message = dict(message, headers=list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Streaming responses keep running after the headers go out, so the
+            # profile covers the request until its last byte
+            if profiler is not None:
+                self.profiles.put(profile_id, profiler.stop().collapsed())
+            # The matched route's template keeps label cardinality bounded
+            route = scope.get("route")
+            path = getattr(route, "path", "other")
+            metrics.observe("hospibot_http_request_seconds",
+                            (("method", scope["method"]), ("path", path), ("status", str(status))),
+                            time.perf_counter() - start)
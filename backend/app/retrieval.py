@@ -0,0 +1,215 @@
+import math
+import re
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from typing import Dict, List, NamedTuple, Optional, Sequence as SequenceType
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Question words that say nothing about which fact is wanted
+_STOPWORDS = {"a", "an", "the", "is", "are", "was", "be", "i", "me", "my", "we", "you", "your",
+              "can", "could", "do", "does", "how", "what", "when", "where", "which", "who", "why",
+              "to", "of", "in", "on", "at", "for", "and", "or", "there", "it", "this", "that",
+              "please", "tell", "about", "any", "have", "has", "get", "with"}
+
+def _fold(token: str) -> str:
+    # Crude suffix folding so "park"/"parking" and "located"/"location" meet
+    for suffix in ("ing", "ion", "ed", "s"):
+        if len(token) > len(suffix) + 3 and token.endswith(suffix) and not token.endswith("ss"):
+            return token[:-len(suffix)]
+    return token
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        tokens.append(_fold(token))
+    return tokens
+
+# Up to this many facts, search scores every fact with one dense np.bincount
+_DENSE_SCORING_FACTS = 4096
+
+class Fact(NamedTuple):
+    path: str
+    text: str
+
+class Hit(NamedTuple):
+    score: float
+    fact: Fact
+
+def _label(key: str) -> str:
+    return key.replace("_", " ").strip().capitalize()
+
+def flatten_facts(data: Dict) -> List[Fact]:
+    """
+    Turns every field of the hospital data into a standalone, readable fact.
+    Records in lists (doctors, departments) become one fact each.
+    """
+    facts: List[Fact] = []
+
+    def visit(value, path: List[str]):
+        # Mapping/Sequence rather than dict/list, so mapped snapshot records count too
+        if isinstance(value, Mapping):
+            for key, child in value.items():
+                visit(child, path + [key])
+        elif isinstance(value, Sequence) and not isinstance(value, str) and value \
+                and all(isinstance(v, Mapping) for v in value):
+            for i, record in enumerate(value):
+                parts = [f"{_label(k)}: {v}" for k, v in record.items() if not isinstance(v, (Mapping, list))]
+                facts.append(Fact(f"{'.'.join(path)}[{i}]", f"{_label(path[-1])} - " + "; ".join(parts)))
+        else:
+            if isinstance(value, list):
+                value = ", ".join(str(v) for v in value)
+            # Keep the parent key for context, except for the top-level section
+            label = _label(path[-1]) if len(path) <= 2 else f"{_label(path[-1])} ({path[-2].replace('_', ' ')})"
+            facts.append(Fact(".".join(path), f"{label}: {value}"))
+
+    visit(data, [])
+    return facts
+
+class RetrievalIndex:
+    """
+    Offline TF-IDF retrieval over hospital facts.
+
+    The TF-IDF matrix is stored column-wise (per term: the facts containing it and
+    their L2-normalized weights), so scoring a query only touches the postings of
+    its few terms. The facts in those postings are renumbered densely, so one
+    np.bincount gives the cosine similarity of every candidate and the top k is
+    picked among them; no step is proportional to the total number of facts. Small
+    indexes skip the renumbering and score every fact directly.
+
+    Rebuilding with `previous` copies the term frequencies of facts whose path and
+    text are unchanged straight from its arrays and only tokenizes new, edited or
+    moved facts. The
+    vocabulary, IDF and normalized weights depend on every fact, so they are then
+    recomputed with whole-array operations.
+    """
+
+    def __init__(self, facts: List[Fact], previous: Optional["RetrievalIndex"] = None):
+        self.facts = facts
+        n_facts = len(facts)
+
+        # Term ids of the previous index stay valid while new terms are appended;
+        # unused ones are dropped when the final vocabulary is sorted below
+        reuse = previous is not None and previous._row_ptr is not None
+        terms: List[str] = list(previous.vocabulary) if reuse else []
+        term_ids: Dict[str, int] = dict(previous.vocabulary) if reuse else {}
+        previous_rows = previous._fact_rows if reuse else {}
+
+        source = np.full(n_facts, -1, dtype=np.int64)
+        rows, cols, tf = [], [], []
+        for row, fact in enumerate(facts):
+            old = previous_rows.get(fact)
+            if old is not None:
+                source[row] = old
+                continue
+            for term, count in Counter(tokenize(fact.path + " " + fact.text)).items():
+                j = term_ids.get(term)
+                if j is None:
+                    j = term_ids[term] = len(terms)
+                    terms.append(term)
+                rows.append(row)
+                cols.append(j)
+                tf.append(1 + math.log(count))
+        rows = np.asarray(rows, dtype=np.int32)
+        cols = np.asarray(cols, dtype=np.int32)
+        tf = np.asarray(tf, dtype=np.float32)
+
+        reused = np.flatnonzero(source >= 0)
+        if len(reused):
+            # Gather each reused fact's span of the previous row-major arrays
+            starts = previous._row_ptr[source[reused]]
+            lengths = previous._row_ptr[source[reused] + 1] - starts
+            positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            rows = np.concatenate([np.repeat(reused, lengths).astype(np.int32), rows])
+            cols = np.concatenate([previous._row_terms[positions], cols])
+            tf = np.concatenate([previous._row_tf[positions], tf])
+            if len(reused) < n_facts:
+                # Back into fact order, keeping each fact's terms in their original order
+                order = np.argsort(rows, kind="stable")
+                rows, cols, tf = rows[order], cols[order], tf[order]
+
+        # Each (fact, term) pair occurs once, so term counts over the entries are the df
+        df = np.bincount(cols, minlength=len(terms))
+        live = sorted(terms[j] for j in np.flatnonzero(df))
+        self.vocabulary: Dict[str, int] = {term: i for i, term in enumerate(live)}
+        remap = np.zeros(len(terms), dtype=np.int32)
+        for term, i in self.vocabulary.items():
+            remap[term_ids[term]] = i
+        cols = remap[cols]
+        self.idf = np.array([math.log((1 + n_facts) / (1 + df[term_ids[t]])) + 1 for t in live], dtype=np.float32)
+
+        # Raw term frequencies in fact order, for the next rebuild to copy from
+        self._row_ptr = np.zeros(n_facts + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_facts), out=self._row_ptr[1:])
+        self._row_terms, self._row_tf = cols, tf
+        # Keyed by path and text: the path is tokenized too, so a moved fact is re-tokenized
+        self._fact_rows: Dict[Fact, int] = {fact: row for row, fact in enumerate(facts)}
+
+        weights = tf * self.idf[cols] if len(cols) else np.zeros(0, np.float32)
+
+        # L2-normalize each fact's row
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n_facts)).astype(np.float32)
+        if len(rows):
+            weights = weights / norms[rows]
+
+        # Compressed sparse column layout: postings of term j are indptr[j]:indptr[j+1]
+        order = np.argsort(cols, kind="stable")
+        self._indices = rows[order]
+        self._data = weights[order]
+        self._indptr = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=len(self.vocabulary)), out=self._indptr[1:])
+
+    @classmethod
+    def from_data(cls, data: Dict, previous: Optional["RetrievalIndex"] = None) -> "RetrievalIndex":
+        return cls(flatten_facts(data), previous)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """The arrays that, with the facts and vocabulary, fully define the index."""
+        return {"idf": self.idf, "indices": self._indices, "data": self._data, "indptr": self._indptr}
+
+    @classmethod
+    def from_arrays(cls, facts: SequenceType[Fact], terms: List[str], idf: np.ndarray,
+                    indices: np.ndarray, data: np.ndarray, indptr: np.ndarray) -> "RetrievalIndex":
+        """
+        An index restored from a previous build's `arrays()`, e.g. mapped from a
+        compiled snapshot. It has no raw term frequencies, so the next rebuild from
+        it tokenizes every fact.
+        """
+        index = cls.__new__(cls)
+        index.facts = facts
+        index._row_ptr = index._row_terms = index._row_tf = None
+        index._fact_rows = {}
+        index.vocabulary = {term: i for i, term in enumerate(terms)}
+        index.idf, index._indices, index._data, index._indptr = idf, indices, data, indptr
+        return index
+
+    def search(self, query: str, k: int = 3, min_score: float = 0.0) -> List[Hit]:
+        counts = Counter(t for t in tokenize(query) if t in self.vocabulary)
+        if not counts or not self.facts:
+            return []
+        terms = [self.vocabulary[t] for t in counts]
+        q = np.array([1 + math.log(c) for c in counts.values()], dtype=np.float32) * self.idf[terms]
+        q /= np.linalg.norm(q)
+
+        spans = [(self._indptr[j], self._indptr[j + 1]) for j in terms]
+        rows = np.concatenate([self._indices[a:b] for a, b in spans])
+        weights = np.concatenate([self._data[a:b] * w for (a, b), w in zip(spans, q)])
+        if len(self.facts) <= _DENSE_SCORING_FACTS:
+            # Small index: scoring every fact is cheaper than finding the candidates
+            candidates = np.arange(len(self.facts))
+            scores = np.bincount(rows, weights=weights, minlength=len(self.facts))
+        else:
+            # Score only the facts in the postings: candidates are the distinct rows,
+            # and `slots` maps each posting to its candidate
+            candidates, slots = np.unique(rows, return_inverse=True)
+            scores = np.bincount(slots, weights=weights)
+
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(candidates) else np.arange(len(candidates))
+        # Ties go to the earlier fact, as candidates are sorted by row
+        top = top[np.lexsort((candidates[top], -scores[top]))]
+        return [Hit(float(scores[i]), self.facts[candidates[i]]) for i in top if scores[i] > min_score]
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, Optional
+
+GRAPH_MODE = "graph"
+FAST_MODE = "fast"
+
+
+class Runtime:
+    """
+    The expensive parts of the backend: LangGraph, the compiled workflow, the guardian
+    and the default hospital's data. `start` loads them once in a background thread,
+    so the server accepts connections and answers liveness probes while they warm up,
+    and readiness flips only when everything loaded.
+    """
+
+    def __init__(self, execution_mode: str = GRAPH_MODE):
+        self.execution_mode = execution_mode
+        self.graph_runner: Any = None
+        self.guardian: Any = None
+        self.run_batch: Optional[Callable] = None
+        self.default_hospital: Any = None
+        self.error: Optional[str] = None
+        # Seconds the warm-up took, once it finished
+        self.warmup_seconds: Optional[float] = None
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # One asyncio.Event per event loop with requests waiting on the warm-up,
+        # set from the warm-up thread through call_soon_threadsafe
+        self._loop_events: Dict[asyncio.AbstractEventLoop, asyncio.Event] = {}
+
+    def start(self):
+        """Starts the warm-up unless it already started. Returns immediately."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._load, name="hospibot-warmup", daemon=True)
+            self._thread.start()
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            # Importing the graph module loads the default hospital and compiles the workflow
+            from . import graph
+            from .hospital_data import default_hospital_data
+
+            if self.execution_mode == FAST_MODE and graph.fast_app is None:
+                print("Warning: graph topology does not support the fast path; using LangGraph")
+            self.graph_runner = graph.fast_app if self.execution_mode == FAST_MODE and graph.fast_app is not None else graph.app
+            self.guardian = graph.guardian
+            self.run_batch = graph.run_batch
+            self.default_hospital = default_hospital_data()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+        finally:
+            self.warmup_seconds = time.perf_counter() - start
+            with self._lock:
+                self._done.set()
+                loop_events, self._loop_events = self._loop_events, {}
+            for loop, event in loop_events.items():
+                try:
+                    loop.call_soon_threadsafe(event.set)
+                except RuntimeError:
+                    # That loop has been closed; nobody is waiting on it anymore
+                    pass
+
+    def load(self) -> bool:
+        """Starts the warm-up if needed and blocks until it finishes; for scripts and tests."""
+        self.start()
+        self._done.wait()
+        return self.ready
+
+    @property
+    def loaded(self) -> bool:
+        """The graph and data are in place, though the data file may have been rejected."""
+        return self._done.is_set() and self.error is None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded and self.default_hospital.snapshot.content_hash != ""
+
+    def status(self) -> str:
+        if not self._done.is_set():
+            return "warming up"
+        if self.error:
+            return f"warm-up failed: {self.error}"
+        if not self.ready:
+            return f"no hospital data: {self.default_hospital.last_error}"
+        return "ready"
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Waits up to `timeout` seconds for the warm-up; True once it has loaded.
+        Waiting requests hold no threads, however many arrive during a cold start.
+        """
+        if not self._done.is_set():
+            self.start()
+            loop = asyncio.get_running_loop()
+            with self._lock:
+                # Checked again under the lock, so the warm-up can't finish unnoticed
+                if not self._done.is_set():
+                    event = self._loop_events.get(loop)
+                    if event is None:
+                        event = self._loop_events[loop] = asyncio.Event()
+                else:
+                    event = None
+            if event is not None:
+                try:
+                    await asyncio.wait_for(event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        return self.loaded
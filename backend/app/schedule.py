@@ -0,0 +1,192 @@
+import datetime
+import re
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+_DAY_INDEX = {name[:3].lower(): i for i, name in enumerate(DAY_NAMES)}
+
+# "Mon, Wed, Fri: ..." / "Mon-Fri: ..." - a day list is letters, commas and dashes only
+_DAYS_PREFIX_RE = re.compile(r"^\s*([A-Za-z][A-Za-z ,\-–]*):\s*(.*)$")
+_TIME = r"(\d{1,2})(?::(\d{2}))?\s*([AaPp])\.?[Mm]\.?"
+_RANGE_RE = re.compile(_TIME + r"\s*(?:-|–|to)\s*" + _TIME)
+
+def _minute(hour: str, minute: Optional[str], meridiem: str) -> int:
+    h, m = int(hour), int(minute or 0)
+    if not (1 <= h <= 12 and 0 <= m < 60):
+        raise ValueError(f"invalid time {hour}:{minute or '00'}")
+    return (h % 12 + (12 if meridiem.lower() == "p" else 0)) * 60 + m
+
+def _parse_days(text: str) -> List[int]:
+    days = []
+    for part in re.split(r"\s*,\s*", text.strip()):
+        ends = re.split(r"\s*(?:-|–|to)\s*", part)
+        try:
+            idx = [_DAY_INDEX[e.strip()[:3].lower()] for e in ends]
+        except KeyError:
+            raise ValueError(f"unknown day in {part!r}")
+        if len(idx) == 1:
+            days.append(idx[0])
+        else:
+            start, end = idx[0], idx[-1]
+            days.extend((start + k) % 7 for k in range((end - start) % 7 + 1))
+    return days
+
+def format_minute(minute: int) -> str:
+    """Formats minutes since midnight as e.g. '5:00 PM'."""
+    minute %= MINUTES_PER_DAY
+    hour, m = divmod(minute, 60)
+    return f"{hour % 12 or 12}:{m:02d} {'AM' if hour < 12 else 'PM'}"
+
+def week_minute(when: datetime.datetime) -> int:
+    return when.weekday() * MINUTES_PER_DAY + when.hour * 60 + when.minute
+
+class WeeklySchedule:
+    """
+    A recurring weekly schedule stored as one sorted array of interval boundaries in
+    minutes since Monday 00:00: [open, close, open, close, ...].
+
+    Whether the schedule is open at minute t is the parity of bisect_right(bounds, t),
+    so every query is a single binary search.
+    """
+
+    __slots__ = ("text", "bounds")
+
+    def __init__(self, intervals: Sequence[Tuple[int, int]], text: str = ""):
+        self.text = text
+        merged: List[List[int]] = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.bounds = array("i", [b for interval in merged for b in interval])
+
+    @classmethod
+    def parse(cls, text: str) -> "WeeklySchedule":
+        """
+        Parses strings such as "Mon, Wed, Fri: 10AM - 2PM", "Mon-Fri: 9AM - 4PM" or
+        "10:00 AM - 12:00 PM and 5:00 PM - 7:00 PM" (no days means every day).
+        Segments separated by ';' may each name their own days. Raises ValueError.
+        """
+        if text.strip().lower() in ("24/7", "24 hours", "always"):
+            return cls([(0, MINUTES_PER_WEEK)], text)
+
+        intervals = []
+        for segment in text.split(";"):
+            prefix = _DAYS_PREFIX_RE.match(segment)
+            if prefix:
+                days, rest = _parse_days(prefix.group(1)), prefix.group(2)
+            else:
+                days, rest = list(range(7)), segment
+            ranges = _RANGE_RE.findall(rest)
+            if not ranges:
+                raise ValueError(f"no time range in {segment.strip()!r}")
+            for h1, m1, p1, h2, m2, p2 in ranges:
+                start, end = _minute(h1, m1, p1), _minute(h2, m2, p2)
+                if end <= start:
+                    end += MINUTES_PER_DAY  # runs past midnight
+                for day in days:
+                    offset = day * MINUTES_PER_DAY
+                    s, e = offset + start, offset + end
+                    if e > MINUTES_PER_WEEK:
+                        # Sunday night into Monday morning wraps to the start of the week
+                        intervals.append((0, e - MINUTES_PER_WEEK))
+                        e = MINUTES_PER_WEEK
+                    intervals.append((s, e))
+        return cls(intervals, text)
+
+    def is_open_at(self, minute: int) -> bool:
+        return bisect_right(self.bounds, minute % MINUTES_PER_WEEK) % 2 == 1
+
+    def is_open(self, when: datetime.datetime) -> bool:
+        return self.is_open_at(week_minute(when))
+
+    def next_change(self, when: datetime.datetime) -> Optional[datetime.datetime]:
+        """
+        When the schedule next opens (if closed now) or closes (if open now).
+        """
+        if not self.bounds:
+            return None
+        t = week_minute(when)
+        i = bisect_right(self.bounds, t)
+        if i < len(self.bounds):
+            delta = self.bounds[i] - t
+        else:
+            delta = self.bounds[0] + MINUTES_PER_WEEK - t
+        return when.replace(second=0, microsecond=0) + datetime.timedelta(minutes=delta)
+
+    def next_opening(self, when: datetime.datetime) -> Optional[datetime.datetime]:
+        """The next time the schedule opens; `when` itself if it is open now."""
+        if self.is_open(when):
+            return when
+        return self.next_change(when)
+
+    def hours_on(self, weekday: int) -> List[Tuple[int, int]]:
+        """
+        (start, end) minutes since midnight for the intervals that start on `weekday`.
+        """
+        day_start = weekday * MINUTES_PER_DAY
+        bounds = self.bounds
+        result = []
+        for i in range(0, len(bounds), 2):
+            if day_start <= bounds[i] < day_start + MINUTES_PER_DAY:
+                result.append((bounds[i] - day_start, bounds[i + 1] - day_start))
+        return result
+
+class RosterAvailability:
+    """
+    "Who is available at time T" over a whole roster of WeeklySchedules.
+
+    Every interval of every schedule goes into one array sorted by start. An interval
+    covering T must start in (T - longest interval, T], which two binary searches
+    find; a vectorized comparison on the ends of that slice does the rest.
+    """
+
+    def __init__(self, schedules: Sequence[Optional[WeeklySchedule]]):
+        starts, ends, owners = [], [], []
+        for owner, schedule in enumerate(schedules):
+            if schedule is None:
+                continue
+            bounds = schedule.bounds
+            starts.extend(bounds[0::2])
+            ends.extend(bounds[1::2])
+            owners.extend([owner] * (len(bounds) // 2))
+        order = np.argsort(np.asarray(starts, dtype=np.int32), kind="stable")
+        self._starts = np.asarray(starts, dtype=np.int32)[order]
+        self._ends = np.asarray(ends, dtype=np.int32)[order]
+        self._owners = np.asarray(owners, dtype=np.int32)[order]
+        self._longest = int((self._ends - self._starts).max()) if len(order) else 0
+
+    def available_at_minute(self, minute: int) -> np.ndarray:
+        """Sorted indexes of the schedules open at `minute` of the week."""
+        minute %= MINUTES_PER_WEEK
+        lo = np.searchsorted(self._starts, minute - self._longest, side="right")
+        hi = np.searchsorted(self._starts, minute, side="right")
+        open_now = self._ends[lo:hi] > minute
+        return np.unique(self._owners[lo:hi][open_now])
+
+    def available_at(self, when: datetime.datetime) -> np.ndarray:
+        return self.available_at_minute(week_minute(when))
+
+    def available_on(self, weekday: int) -> np.ndarray:
+        """Sorted indexes of the schedules with an interval starting on `weekday`, like hours_on."""
+        day_start = weekday * MINUTES_PER_DAY
+        lo = np.searchsorted(self._starts, day_start, side="left")
+        hi = np.searchsorted(self._starts, day_start + MINUTES_PER_DAY, side="left")
+        return np.unique(self._owners[lo:hi])
+
+def try_parse(text: Optional[str]) -> Optional[WeeklySchedule]:
+    """WeeklySchedule.parse that returns None for missing or unparseable strings."""
+    if not text:
+        return None
+    try:
+        return WeeklySchedule.parse(text)
+    except ValueError:
+        return None
@@ -0,0 +1,276 @@
+import sqlite3
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .tenancy import DEFAULT_HOSPITAL
+
+# (hospital_id, session_id): the frontend's session IDs are only unique per hospital
+SessionKey = Tuple[str, str]
+
+
+class _Session:
+    __slots__ = ("messages", "nbytes", "last_seen")
+
+    def __init__(self, window: int):
+        self.messages: Deque[str] = deque(maxlen=window)
+        self.nbytes = 0
+        self.last_seen = time.monotonic()
+
+
+class SessionStore:
+    """
+    Per-session conversation history, keyed by hospital and the session ID the
+    frontend generates.
+
+    Only the last `window` messages of a session are kept. Sessions are evicted in
+    LRU order once they are idle for `ttl_seconds`, or when the store exceeds
+    `max_sessions` or roughly `max_bytes` of message text. When `db_path` is set,
+    messages are also written to SQLite so that evicted sessions, and sessions from
+    before a restart, are reloaded on their next message instead of being lost.
+
+    SQLite writes happen on a background thread, one transaction per batch, so
+    `append` only queues them. Past `max_pending` queued writes, new ones are
+    dropped and counted in `persist_dropped`; the in-memory history is unaffected.
+    Reading a session back from SQLite blocks on the writer's transaction, so async
+    callers run `preload` in a worker thread when `needs_load` says it would.
+    """
+
+    def __init__(self, window: int = 20, max_sessions: int = 10000,
+                 max_bytes: int = 32 * 1024 * 1024, ttl_seconds: float = 3600,
+                 db_path: Optional[str] = None, max_pending: int = 10000):
+        self.window = window
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[SessionKey, _Session]" = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes_since_purge = 0
+        self.max_pending = max_pending
+        self.persist_dropped = 0
+        # ("append" | "clear", hospital_id, session_id, message, ts), oldest first. Only
+        # the writer removes entries, and only after committing them.
+        self._pending: Deque[Tuple[str, str, str, str, float]] = deque()
+        # Serializes use of the connection: the writer's transactions and cold loads
+        self._db_lock = threading.Lock()
+        # Sessions being preloaded, each with a token that `append`, `get` and `clear`
+        # withdraw so a preload that raced with them is discarded
+        self._loading: Dict[SessionKey, object] = {}
+        self._wake = threading.Event()
+        self._closing = False
+        self._writer: Optional[threading.Thread] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS session_messages ("
+                " hospital_id TEXT NOT NULL, session_id TEXT NOT NULL, seq INTEGER NOT NULL,"
+                " content TEXT NOT NULL, ts REAL NOT NULL, PRIMARY KEY (hospital_id, session_id, seq))"
+            )
+            self._migrate_legacy_table()
+            self._writer = threading.Thread(target=self._write_loop, name="session-store-writer", daemon=True)
+            self._writer.start()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _migrate_legacy_table(self):
+        # Databases from before hospitals had their own sessions hold the default hospital's
+        legacy = self._db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages'").fetchone()
+        if legacy is None:
+            return
+        self._db.execute("BEGIN")
+        self._db.execute("INSERT OR IGNORE INTO session_messages (hospital_id, session_id, seq, content, ts)"
+                         " SELECT ?, session_id, seq, content, ts FROM messages", (DEFAULT_HOSPITAL,))
+        self._db.execute("DROP TABLE messages")
+        self._db.execute("COMMIT")
+
+    def needs_load(self, hospital_id: str, session_id: str) -> bool:
+        """Whether the next `append` for this session would first read it from SQLite."""
+        return self._db is not None and (hospital_id, session_id) not in self._sessions
+
+    def preload(self, hospital_id: str, session_id: str):
+        """
+        Reads a session from SQLite into memory ahead of its `append`. Blocks while the
+        writer commits, but without holding the lock every other session needs.
+        """
+        key = (hospital_id, session_id)
+        token = object()
+        with self._lock:
+            if key in self._sessions:
+                return
+            self._loading[key] = token
+        session = self._load(key)
+        with self._lock:
+            # Anything that touched the session meanwhile loaded or cleared it itself
+            if self._loading.get(key) is not token:
+                return
+            del self._loading[key]
+            self._sessions[key] = session
+            self._nbytes += session.nbytes
+            self._evict()
+
+    def append(self, hospital_id: str, session_id: str, message: str) -> List[str]:
+        """Records a new message and returns the session's window, ending with it."""
+        key = (hospital_id, session_id)
+        with self._lock:
+            session = self._get_or_load(key)
+            if len(session.messages) == self.window:
+                dropped = session.messages[0]
+                session.nbytes -= len(dropped)
+                self._nbytes -= len(dropped)
+            session.messages.append(message)
+            session.nbytes += len(message)
+            self._nbytes += len(message)
+            session.last_seen = time.monotonic()
+            self._persist(key, message)
+            self._evict()
+            return list(session.messages)
+
+    def get(self, hospital_id: str, session_id: str) -> List[str]:
+        with self._lock:
+            session = self._get_or_load((hospital_id, session_id))
+            return list(session.messages)
+
+    def clear(self, hospital_id: str, session_id: str):
+        key = (hospital_id, session_id)
+        with self._lock:
+            self._loading.pop(key, None)
+            session = self._sessions.pop(key, None)
+            if session is not None:
+                self._nbytes -= session.nbytes
+            self._queue_write("clear", key, "")
+
+    def _get_or_load(self, key: SessionKey) -> _Session:
+        session = self._sessions.get(key)
+        if session is not None:
+            self._sessions.move_to_end(key)
+            return session
+
+        self._loading.pop(key, None)
+        session = self._load(key)
+        self._sessions[key] = session
+        self._nbytes += session.nbytes
+        return session
+
+    def _load(self, key: SessionKey) -> _Session:
+        session = _Session(self.window)
+        if self._db is None:
+            return session
+        cutoff = time.time() - self.ttl_seconds
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT content FROM session_messages WHERE hospital_id = ? AND session_id = ? AND ts >= ?"
+                " ORDER BY seq DESC LIMIT ?",
+                (key[0], key[1], cutoff, self.window),
+            ).fetchall()
+            # Writes still queued are newer than anything on disk
+            pending = [w for w in list(self._pending) if (w[1], w[2]) == key]
+        for (content,) in reversed(rows):
+            session.messages.append(content)
+        for op, _, _, content, ts in pending:
+            if op == "clear":
+                session.messages.clear()
+            elif ts >= cutoff:
+                session.messages.append(content)
+        session.nbytes = sum(len(m) for m in session.messages)
+        return session
+
+    def _persist(self, key: SessionKey, message: str):
+        if self._db is not None:
+            self._queue_write("append", key, message)
+
+    def _queue_write(self, op: str, key: SessionKey, message: str):
+        if self._db is None:
+            return
+        if len(self._pending) >= self.max_pending:
+            self.persist_dropped += 1
+            return
+        self._pending.append((op, key[0], key[1], message, time.time()))
+        self._wake.set()
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                self._write_pending()
+            except Exception:
+                # A locked or full database must not stop later writes
+                traceback.print_exc()
+            if self._closing:
+                return
+
+    def _write_pending(self):
+        """Commits everything queued so far in one transaction."""
+        batch = list(self._pending)
+        if not batch:
+            return
+        db = self._db
+        with self._db_lock:
+            try:
+                db.execute("BEGIN")
+                next_seq = {}
+                for op, hospital_id, session_id, message, ts in batch:
+                    key = (hospital_id, session_id)
+                    if op == "clear":
+                        db.execute("DELETE FROM session_messages WHERE hospital_id = ? AND session_id = ?", key)
+                        next_seq[key] = 1
+                        continue
+                    seq = next_seq.get(key)
+                    if seq is None:
+                        (seq,) = db.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM session_messages"
+                                            " WHERE hospital_id = ? AND session_id = ?", key).fetchone()
+                    db.execute("INSERT INTO session_messages (hospital_id, session_id, seq, content, ts)"
+                               " VALUES (?, ?, ?, ?, ?)", (hospital_id, session_id, seq, message, ts))
+                    next_seq[key] = seq + 1
+                # Keep the on-disk history to the same window as memory
+                db.executemany("DELETE FROM session_messages WHERE hospital_id = ? AND session_id = ? AND seq <= ?",
+                               [(h, s, seq - 1 - self.window) for (h, s), seq in next_seq.items()])
+                db.execute("COMMIT")
+            except Exception:
+                if db.in_transaction:
+                    db.execute("ROLLBACK")
+                # Dropped rather than retried forever; memory still has the history
+                self.persist_dropped += len(batch)
+                raise
+            finally:
+                for _ in batch:
+                    self._pending.popleft()
+
+        self._writes_since_purge += len(batch)
+        if self._writes_since_purge >= 1000:
+            self._writes_since_purge = 0
+            with self._db_lock:
+                db.execute("DELETE FROM session_messages WHERE ts < ?", (time.time() - self.ttl_seconds,))
+
+    def flush(self):
+        """Blocks until every queued write is in SQLite; for shutdown, scripts and tests."""
+        while self._pending and self._writer is not None and self._writer.is_alive():
+            self._wake.set()
+            time.sleep(0.005)
+
+    def close(self):
+        """Writes out what is queued and stops the writer thread."""
+        if self._writer is None:
+            return
+        self._closing = True
+        self._wake.set()
+        self._writer.join()
+        self._writer = None
+
+    def _evict(self):
+        sessions = self._sessions
+        cutoff = time.monotonic() - self.ttl_seconds
+        # The LRU head is always the least recently seen session
+        while sessions:
+            oldest_id, oldest = next(iter(sessions.items()))
+            if (oldest.last_seen >= cutoff and len(sessions) <= self.max_sessions
+                    and self._nbytes <= self.max_bytes):
+                break
+            sessions.popitem(last=False)
+            self._nbytes -= oldest.nbytes
@@ -0,0 +1,166 @@
+import os
+import re
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+
+from .hospital_data import HospitalData, default_hospital_data
+
+# Per-hospital data files live here as <hospital_id>.json
+HOSPITALS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "hospitals")
+
+# Served from data/hospital_info.json, and never evicted
+DEFAULT_HOSPITAL = "default"
+
+# Hospital IDs become file names, so they are restricted to a safe alphabet
+_HOSPITAL_ID_RE = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+
+class UnknownHospital(KeyError):
+    pass
+
+
+class HospitalUnavailable(Exception):
+    """The hospital's data file exists but has never loaded successfully."""
+
+
+class _Tenant:
+    __slots__ = ("data", "last_used")
+
+    def __init__(self, data: HospitalData):
+        self.data = data
+        self.last_used = time.monotonic()
+
+
+class HospitalRegistry:
+    """
+    Serves many hospitals from one process: each hospital's HospitalData is loaded
+    on first use, kept in an LRU of at most `max_loaded` entries, and dropped after
+    `idle_ttl` seconds without requests. The default hospital is always resident.
+
+    One watcher thread replaces the per-instance watchers: it reloads every loaded
+    hospital whose file changed and evicts idle ones.
+
+    `default` falls back to the process-wide hospital_data, loaded on first use.
+    """
+
+    def __init__(self, directory: str = HOSPITALS_DIR, default: Optional[HospitalData] = None,
+                 max_loaded: int = 32, idle_ttl: float = 1800):
+        self.directory = directory
+        self._default = default
+        self.max_loaded = max_loaded
+        self.idle_ttl = idle_ttl
+        # Recency lives in each tenant's last_used rather than in dict order, so
+        # lookups of loaded hospitals never take the lock a slow load is holding
+        self._tenants: Dict[str, _Tenant] = {}
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self._tenants) + 1
+
+    @property
+    def default(self) -> HospitalData:
+        if self._default is None:
+            self._default = default_hospital_data()
+        return self._default
+
+    def path_for(self, hospital_id: str) -> str:
+        if not _HOSPITAL_ID_RE.match(hospital_id):
+            raise UnknownHospital(hospital_id)
+        return os.path.join(self.directory, f"{hospital_id}.json")
+
+    def exists(self, hospital_id: Optional[str]) -> bool:
+        """Whether the hospital is known, without loading its data."""
+        if not hospital_id or hospital_id == DEFAULT_HOSPITAL or hospital_id in self._tenants:
+            return True
+        try:
+            return os.path.exists(self.path_for(hospital_id))
+        except UnknownHospital:
+            return False
+
+    def peek(self, hospital_id: Optional[str]) -> Optional[HospitalData]:
+        """The hospital if it is already loaded, without touching the disk."""
+        if not hospital_id or hospital_id == DEFAULT_HOSPITAL:
+            return self.default
+        tenant = self._tenants.get(hospital_id)
+        if tenant is None:
+            return None
+        tenant.last_used = time.monotonic()
+        return tenant.data
+
+    def get(self, hospital_id: Optional[str]) -> HospitalData:
+        """
+        The hospital's data, loading it if needed. Raises UnknownHospital when there
+        is no data file for it and HospitalUnavailable when the file doesn't load.
+        Loading reads the disk, so async callers should try `peek` first.
+        """
+        data = self.peek(hospital_id)
+        if data is not None:
+            return data
+
+        path = self.path_for(hospital_id)
+        with self._lock:
+            # Another request may have loaded it while we waited for the lock
+            tenant = self._tenants.get(hospital_id)
+            if tenant is None:
+                if not os.path.exists(path):
+                    raise UnknownHospital(hospital_id)
+                loaded = HospitalData(path)
+                if loaded.snapshot.content_hash == "":
+                    raise HospitalUnavailable(loaded.last_error or f"No data for {hospital_id}")
+                self._evict_idle_locked()
+                while len(self._tenants) >= self.max_loaded:
+                    del self._tenants[min(self._tenants, key=lambda h: self._tenants[h].last_used)]
+                tenant = self._tenants[hospital_id] = _Tenant(loaded)
+            tenant.last_used = time.monotonic()
+            return tenant.data
+
+    def loaded(self) -> List[str]:
+        return [DEFAULT_HOSPITAL] + list(self._tenants)
+
+    def _evict_idle_locked(self) -> int:
+        cutoff = time.monotonic() - self.idle_ttl
+        idle = [h for h, t in list(self._tenants.items()) if t.last_used < cutoff]
+        for hospital_id in idle:
+            del self._tenants[hospital_id]
+        return len(idle)
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            return self._evict_idle_locked()
+
+    def reload_changed(self):
+        # One hospital's broken file or unreadable directory must not stop the others
+        for data in [self.default] + [tenant.data for tenant in list(self._tenants.values())]:
+            try:
+                data.reload_if_changed()
+            except Exception:
+                traceback.print_exc()
+
+    def start_watcher(self, interval: float = 2.0):
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+
+        def watch():
+            while not self._stop_watching.wait(interval):
+                # The watcher keeps running whatever happens, or hot reload and
+                # idle eviction would silently stop for every hospital
+                try:
+                    self.reload_changed()
+                    self.evict_idle()
+                except Exception:
+                    traceback.print_exc()
+
+        self._watcher = threading.Thread(target=watch, name="hospital-registry-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        if self._watcher is None:
+            return
+        self._stop_watching.set()
+        self._watcher.join()
+        self._watcher = None
@@ -1,40 +1,572 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from app.graph import app as workflow_app
-from typing import List
+import datetime
+import json
+import os
+import time
+import traceback
+from contextlib import asynccontextmanager
+from fastapi import Body, Depends, FastAPI, Header, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from app.admission import HIGH, NORMAL, AdmissionController, Overloaded, TokenBucketLimiter, retry_after_header
+from app.conversation_log import LOG_DIR, ConversationLog
+from app.hospital_data import RENDERED_SECTIONS, HospitalData
+from app.intents import MEDICAL_INTENT, intent_matcher
+from app.live_status import StatusBoard, etag_matches
+from app.metrics import MetricsMiddleware, ProfileStore, metrics, record_error, record_result
+from app.runtime import Runtime
+from app.sessions import SessionStore
+from app.tenancy import DEFAULT_HOSPITAL, HOSPITALS_DIR, HospitalRegistry, HospitalUnavailable, UnknownHospital
+from typing import Any, Dict, List, Optional
 
-app = FastAPI(title="HospiBot API", description="Hospital Information Chatbot Backend")
+# Upper bound on graph runs interleaving on the event loop. Past this, extra runs only
+# add scheduling overhead and stretch every request's latency, so they wait their turn.
+MAX_CONCURRENT_RUNS = int(os.environ.get("HOSPIBOT_MAX_CONCURRENT_RUNS", "8"))
+
+# "graph" runs every request through LangGraph; "fast" calls the nodes directly
+EXECUTION_MODE = os.environ.get("HOSPIBOT_EXECUTION_MODE", "graph")
+
+# Requests allowed to wait for a graph slot, and for how long, before getting a 503
+ADMISSION_QUEUE = int(os.environ.get("HOSPIBOT_ADMISSION_QUEUE", "64"))
+ADMISSION_TIMEOUT = float(os.environ.get("HOSPIBOT_ADMISSION_TIMEOUT", "2"))
+
+# Extra slots only medical and emergency messages may use
+PRIORITY_RESERVE = int(os.environ.get("HOSPIBOT_PRIORITY_RESERVE", "2"))
+
+# Per-session token bucket: sustained messages per second and burst size (rate 0 disables)
+SESSION_RATE = float(os.environ.get("HOSPIBOT_SESSION_RATE", "1"))
+SESSION_BURST = float(os.environ.get("HOSPIBOT_SESSION_BURST", "10"))
+
+# Largest number of questions accepted by one /chat/batch call
+MAX_BATCH_SIZE = int(os.environ.get("HOSPIBOT_MAX_BATCH_SIZE", "100"))
+
+# Seconds between checks of the data file for changes; 0 disables the watcher
+DATA_WATCH_INTERVAL = float(os.environ.get("HOSPIBOT_DATA_WATCH_INTERVAL", "2"))
+
+# Where per-hospital data files (<hospital_id>.json) are found, how many stay loaded,
+# and how many idle seconds before one is unloaded
+HOSPITALS_DIRECTORY = os.environ.get("HOSPIBOT_HOSPITALS_DIR", HOSPITALS_DIR)
+MAX_HOSPITALS = int(os.environ.get("HOSPIBOT_MAX_HOSPITALS", "32"))
+HOSPITAL_IDLE_TTL = float(os.environ.get("HOSPIBOT_HOSPITAL_IDLE_TTL", "1800"))
+
+# Samples kept per live-status metric; the rolling aggregates cover at most this many
+STATUS_SAMPLES = int(os.environ.get("HOSPIBOT_STATUS_SAMPLES", "2048"))
+
+# Audit log of every chat result, written in the background as zstd JSONL segments
+# (empty disables it). Past CONVERSATION_LOG_QUEUE waiting records, new ones are dropped.
+CONVERSATION_LOG_DIR = os.environ.get("HOSPIBOT_CONVERSATION_LOG_DIR", LOG_DIR)
+CONVERSATION_LOG_SEGMENT_MB = float(os.environ.get("HOSPIBOT_CONVERSATION_LOG_SEGMENT_MB", "64"))
+CONVERSATION_LOG_QUEUE = int(os.environ.get("HOSPIBOT_CONVERSATION_LOG_QUEUE", "10000"))
+
+# Seconds a request arriving during the startup warm-up waits for it before getting a 503
+WARMUP_WAIT = float(os.environ.get("HOSPIBOT_WARMUP_WAIT", "10"))
+
+# /admin endpoints require this value in the X-Admin-Token header and are disabled
+# while it is unset
+ADMIN_TOKEN = os.environ.get("HOSPIBOT_ADMIN_TOKEN")
+
+# Token for feeds pushing live status (X-Status-Token header). POST /status accepts
+# this or the admin token, and refuses every write while neither is configured.
+STATUS_TOKEN = os.environ.get("HOSPIBOT_STATUS_TOKEN")
+
+# LangGraph, the compiled graph and the default hospital's data load in the background
+# after startup, so the process accepts connections (and /healthz) right away
+runtime = Runtime(EXECUTION_MODE)
+
+registry = HospitalRegistry(HOSPITALS_DIRECTORY, max_loaded=MAX_HOSPITALS, idle_ttl=HOSPITAL_IDLE_TTL)
+
+conversation_log = ConversationLog(
+    CONVERSATION_LOG_DIR,
+    segment_bytes=int(CONVERSATION_LOG_SEGMENT_MB * 1024 * 1024),
+    max_queue=CONVERSATION_LOG_QUEUE,
+) if CONVERSATION_LOG_DIR else None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    runtime.start()
+    if DATA_WATCH_INTERVAL > 0:
+        registry.start_watcher(DATA_WATCH_INTERVAL)
+    if conversation_log is not None:
+        conversation_log.start()
+    yield
+    registry.stop_watcher()
+    session_store.close()
+    if conversation_log is not None:
+        conversation_log.stop()
+
+app = FastAPI(title="HospiBot API", description="Hospital Information Chatbot Backend", lifespan=lifespan)
+
+# Per-request profiles taken when a request sends X-HospiBot-Profile: 1 and the admin token
+profiles = ProfileStore()
+app.add_middleware(MetricsMiddleware, profiles=profiles, admin_token=ADMIN_TOKEN)
+
+admission = AdmissionController(
+    max_in_flight=MAX_CONCURRENT_RUNS,
+    max_queue=ADMISSION_QUEUE,
+    queue_timeout=ADMISSION_TIMEOUT,
+    high_reserve=PRIORITY_RESERVE,
+)
+session_limiter = TokenBucketLimiter(SESSION_RATE, SESSION_BURST) if SESSION_RATE > 0 else None
+
+metrics.describe("hospibot_shed_total", "counter", "Requests shed by admission control, by reason and lane")
+metrics.describe("hospibot_rate_limited_total", "counter", "Requests rejected by the per-session rate limit")
+metrics.describe("hospibot_admission_in_flight", "gauge", "Graph runs holding an admission slot")
+metrics.describe("hospibot_admission_queued", "gauge", "Requests waiting for an admission slot")
+metrics.gauge("hospibot_admission_in_flight", lambda: [((), admission.in_flight)])
+metrics.gauge("hospibot_admission_queued", lambda: [((), admission.queued)])
+metrics.gauge("hospibot_shed_total", lambda: [((("reason", r), ("priority", p)), n) for (r, p), n in admission.shed.items()])
+
+# Conversation history lives server-side; set HOSPIBOT_SESSION_DB to persist it in SQLite
+session_store = SessionStore(
+    window=int(os.environ.get("HOSPIBOT_SESSION_WINDOW", "20")),
+    max_sessions=int(os.environ.get("HOSPIBOT_MAX_SESSIONS", "10000")),
+    ttl_seconds=float(os.environ.get("HOSPIBOT_SESSION_TTL", "3600")),
+    db_path=os.environ.get("HOSPIBOT_SESSION_DB"),
+)
+
+metrics.gauge("hospibot_sessions", lambda: [((), len(session_store))])
+metrics.describe("hospibot_session_persist_dropped_total", "counter", "Session messages not written to SQLite (write queue full or write failed)")
+metrics.gauge("hospibot_session_persist_dropped_total", lambda: [((), session_store.persist_dropped)])
+metrics.gauge("hospibot_data_info", lambda: [((("version", runtime.default_hospital.version),), 1)] if runtime.loaded else [])
+metrics.describe("hospibot_ready", "gauge", "1 once the graph is compiled and the default hospital's data loaded")
+metrics.gauge("hospibot_ready", lambda: [((), int(runtime.ready))])
+metrics.describe("hospibot_hospitals_loaded", "gauge", "Hospitals whose data is loaded, including the default")
+metrics.gauge("hospibot_hospitals_loaded", lambda: [((), len(registry))])
+
+# Live ER wait, capacity and department states pushed by hospital systems
+status_board = StatusBoard(capacity=STATUS_SAMPLES, max_hospitals=MAX_HOSPITALS + 1)
+metrics.describe("hospibot_status_updates_total", "counter", "Live-status updates accepted, by hospital")
+
+if conversation_log is not None:
+    metrics.describe("hospibot_conversation_log_written_total", "counter", "Chat results written to the conversation log")
+    metrics.describe("hospibot_conversation_log_dropped_total", "counter", "Chat results dropped from the conversation log (queue full or write failed)")
+    metrics.describe("hospibot_conversation_log_queued", "gauge", "Chat results waiting for the conversation log writer")
+    metrics.gauge("hospibot_conversation_log_written_total", lambda: [((), conversation_log.written)])
+    metrics.gauge("hospibot_conversation_log_dropped_total", lambda: [((), conversation_log.dropped)])
+    metrics.gauge("hospibot_conversation_log_queued", lambda: [((), len(conversation_log))])
+
+async def requested_hospital(hospital_id: Optional[str] = None,
+                             x_hospital_id: Optional[str] = Header(default=None)) -> str:
+    """The ID of the hospital a request names, or DEFAULT_HOSPITAL."""
+    return hospital_id or x_hospital_id or DEFAULT_HOSPITAL
+
+async def selected_hospital(hospital_id: Optional[str] = None,
+                            x_hospital_id: Optional[str] = Header(default=None)) -> HospitalData:
+    """
+    The hospital a request is for: the /hospitals/{hospital_id}/... path (or a
+    ?hospital_id= query), else the X-Hospital-Id header, else the default hospital.
+    """
+    # Every endpoint that reads hospital data needs the warm-up to have finished
+    if not await runtime.wait(WARMUP_WAIT):
+        raise HTTPException(status_code=503, detail=f"Backend not ready: {runtime.status()}",
+                            headers=retry_after_header(1))
+    hospital_id = hospital_id or x_hospital_id
+    data = registry.peek(hospital_id)
+    if data is None:
+        # First request for this hospital: load it off the event loop
+        try:
+            data = await run_in_threadpool(registry.get, hospital_id)
+        except UnknownHospital:
+            raise HTTPException(status_code=404, detail=f"Unknown hospital {hospital_id!r}")
+        except HospitalUnavailable as e:
+            raise HTTPException(status_code=503, detail=f"Hospital data unavailable: {e}")
+    return data
 
 class ChatRequest(BaseModel):
     message: str
+    session_id: Optional[str] = None
+    # Deprecated: only used by clients that do not send a session_id
     history: List[str] = []
 
 class ChatResponse(BaseModel):
     response: str
     intent: str
+    data_version: str = ""
+
+class BatchChatItem(BaseModel):
+    response: str = ""
+    intent: str = ""
+    data_version: str = ""
+    error: Optional[str] = None
+
+class ScheduleStatus(BaseModel):
+    visiting_known: bool
+    visiting_open: bool
+    next_change: Optional[str] = None
+    next_change_day: Optional[str] = None
+    doctors_available: int
+    doctors_total: int
+    data_version: str
+
+class DepartmentUpdate(BaseModel):
+    state: str
+    note: str = ""
+
+class StatusUpdate(BaseModel):
+    metrics: Dict[str, float] = {}
+    departments: Dict[str, DepartmentUpdate] = {}
+    # Unix time the readings were taken; defaults to when the update arrives
+    timestamp: Optional[float] = None
+
+class StatusUpdateResponse(BaseModel):
+    updated_at: float
+    etag: str
+
+class ReloadResponse(BaseModel):
+    reloaded: bool
+    data_version: str
 
-@app.get("/")
+class ProbeStatus(BaseModel):
+    status: str
+    ready: bool
+    data_version: str = ""
+    warmup_seconds: Optional[float] = None
+
+def probe_status() -> ProbeStatus:
+    return ProbeStatus(
+        status=runtime.status(),
+        ready=runtime.ready,
+        data_version=runtime.default_hospital.version if runtime.loaded else "",
+        warmup_seconds=runtime.warmup_seconds,
+    )
+
+@app.get("/", response_model=ProbeStatus)
 def read_root():
-    return {"status": "HospiBot Backend is running"}
+    return probe_status()
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving, whether or not it finished warming up."""
+    return {"status": "ok"}
+
+@app.get("/readyz", response_model=ProbeStatus)
+def readyz():
+    """
+    Readiness: 200 once the graph is compiled and the default hospital's data loaded,
+    503 while warming up or if either failed.
+    """
+    status = probe_status()
+    if not status.ready:
+        return JSONResponse(status_code=503, content=status.model_dump())
+    return status
+
+@app.get("/schedule/now", response_model=ScheduleStatus)
+@app.get("/hospitals/{hospital_id}/schedule/now", response_model=ScheduleStatus)
+def schedule_now(hospital: HospitalData = Depends(selected_hospital)):
+    """
+    Live visiting-hours and doctor availability, computed from the parsed schedules.
+    """
+    data = hospital.snapshot
+    now = datetime.datetime.now()
+    visiting = data.get_visiting_status(now)
+    return ScheduleStatus(
+        visiting_known=visiting["known"],
+        visiting_open=visiting["open"],
+        next_change=visiting["next_change"],
+        next_change_day=visiting["next_change_day"],
+        doctors_available=len(data.roster.available_at(now)),
+        doctors_total=len(data.data.get("doctors", [])),
+        data_version=data.version,
+    )
+
+@app.get("/sections/{section}")
+@app.get("/hospitals/{hospital_id}/sections/{section}")
+def get_section(section: str, hospital: HospitalData = Depends(selected_hospital),
+                if_none_match: Optional[str] = Header(default=None)):
+    """
+    One rendered section of the hospital data (general_info, departments, doctors or
+    billing_info). The body is serialized once per data version and sent as is;
+    its ETag is the data version.
+    """
+    if section not in RENDERED_SECTIONS:
+        raise HTTPException(status_code=404, detail=f"Unknown section {section!r}")
+    data = hospital.snapshot
+    headers = {"ETag": f'"{data.version}"', "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=data.get_rendered_bytes(section), media_type="application/json", headers=headers)
+
+async def status_hospital(hospital_key: str = Depends(requested_hospital)) -> str:
+    """
+    The hospital a live-status request is for, checked like `selected_hospital` but
+    without loading its data or waiting for the warm-up.
+    """
+    if not registry.exists(hospital_key):
+        raise HTTPException(status_code=404, detail=f"Unknown hospital {hospital_key!r}")
+    return hospital_key
+
+@app.get("/status")
+@app.get("/hospitals/{hospital_id}/status")
+async def get_status(hospital_key: str = Depends(status_hospital),
+                     if_none_match: Optional[str] = Header(default=None)):
+    """
+    Live status with rolling aggregates per metric and each department's state.
+    The body is prebuilt on every update; a poll that sends the last ETag in
+    If-None-Match gets an empty 304 until the next one.
+    """
+    status = status_board.get(hospital_key)
+    headers = {"ETag": status.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, status.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=status.body, media_type="application/json", headers=headers)
+
+@app.post("/status", response_model=StatusUpdateResponse)
+@app.post("/hospitals/{hospital_id}/status", response_model=StatusUpdateResponse)
+async def push_status(update: StatusUpdate, hospital_key: str = Depends(status_hospital),
+                      x_status_token: Optional[str] = Header(default=None),
+                      x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Takes readings from hospital systems, e.g.
+    {"metrics": {"er_wait_minutes": 18}, "departments": {"Radiology": {"state": "busy"}}}.
+    """
+    # Fails closed: every dashboard shows these numbers, so an open default is not an option
+    if not STATUS_TOKEN and not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Status updates are disabled; set HOSPIBOT_STATUS_TOKEN")
+    if not ((STATUS_TOKEN and x_status_token == STATUS_TOKEN) or (ADMIN_TOKEN and x_admin_token == ADMIN_TOKEN)):
+        raise HTTPException(status_code=403, detail="Invalid status token")
+    try:
+        status = status_board.for_update(hospital_key)
+        status.update(update.metrics, {name: d.model_dump() for name, d in update.departments.items()},
+                      update.timestamp)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    metrics.inc("hospibot_status_updates_total", (("hospital", hospital_key),))
+    return StatusUpdateResponse(updated_at=status.updated_at, etag=status.etag)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """
+    Node and request latency histograms plus intent, refusal and error counters,
+    in the Prometheus text format.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def check_admin_token(x_admin_token: Optional[str]):
+    # Fails closed like POST /status: a reload costs seconds of CPU on a large roster
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set HOSPIBOT_ADMIN_TOKEN")
+    if x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.get("/admin/profile/{profile_id}", response_class=PlainTextResponse)
+def get_profile(profile_id: str, x_admin_token: Optional[str] = Header(default=None)):
+    """A sampled profile as collapsed stacks, ready for flamegraph tools."""
+    check_admin_token(x_admin_token)
+    collapsed = profiles.get(profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="Unknown or unfinished profile")
+    return PlainTextResponse(collapsed)
+
+@app.post("/admin/reload", response_model=ReloadResponse)
+@app.post("/hospitals/{hospital_id}/admin/reload", response_model=ReloadResponse)
+async def reload_data(x_admin_token: Optional[str] = Header(default=None),
+                      hospital: HospitalData = Depends(selected_hospital)):
+    check_admin_token(x_admin_token)
+    # Parsing and rendering happen in a worker thread, off the event loop. Not forced:
+    # an unchanged file returns without rebuilding anything
+    reloaded = await run_in_threadpool(hospital.reload)
+    if hospital.last_error:
+        raise HTTPException(status_code=422, detail=f"{hospital.last_error}; still serving data version {hospital.version}")
+    return ReloadResponse(reloaded=reloaded, data_version=hospital.version)
+
+def request_priority(message: str) -> str:
+    # The keyword check costs microseconds; the guardian node repeats it inside the graph
+    if runtime.guardian.classify(message).intent == MEDICAL_INTENT or intent_matcher.mentions_emergency(message):
+        return HIGH
+    return NORMAL
+
+def check_rate_limit(request: ChatRequest):
+    # Buckets are keyed by the frontend's user_id. Clients without a session (kiosks
+    # behind one address, load tests) are only bounded by admission control.
+    if session_limiter is None or not request.session_id:
+        return
+    wait = session_limiter.check(request.session_id)
+    if wait:
+        metrics.inc("hospibot_rate_limited_total")
+        raise HTTPException(status_code=429, detail="Too many messages; please slow down",
+                            headers=retry_after_header(wait))
+
+def overloaded(e: Overloaded) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers=retry_after_header(e.retry_after))
+
+def log_conversation(endpoint: str, hospital_key: str, request: ChatRequest, result: dict, seconds: float):
+    # Only queues the record; the conversation log writes it from its own thread
+    if conversation_log is not None:
+        conversation_log.record(endpoint, hospital_key, request.session_id, request.message,
+                                result["current_intent"], result.get("topic", ""), bool(result.get("answered")),
+                                result.get("data_version", ""), seconds)
+
+async def build_input_state(request: ChatRequest, hospital: HospitalData, hospital_key: str) -> dict:
+    # Sessions carry their own bounded history, so the client only sends the new
+    # message; the graph mainly looks at the last one.
+    if request.session_id:
+        # Reading a session back from SQLite can wait on the writer; do it off the loop
+        if session_store.needs_load(hospital_key, request.session_id):
+            await run_in_threadpool(session_store.preload, hospital_key, request.session_id)
+        messages = session_store.append(hospital_key, request.session_id, request.message)
+    else:
+        messages = request.history + [request.message]
+    return {
+        "messages": messages,
+        "current_intent": "",
+        "topic": "",
+        "response": "",
+        "data_version": "",
+        "answered": False,
+        # Pin one snapshot for the whole run so a concurrent reload can't mix versions
+        "hospital": hospital.snapshot,
+    }
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
+@app.post("/hospitals/{hospital_id}/chat", response_model=ChatResponse)
+async def chat_endpoint(request: ChatRequest, hospital: HospitalData = Depends(selected_hospital),
+                        hospital_key: str = Depends(requested_hospital)):
+    check_rate_limit(request)
+    try:
+        release = await admission.admit(request_priority(request.message))
+    except Overloaded as e:
+        raise overloaded(e)
     try:
-        # Prepare state
-        # In a real app we'd maintain history properly. Here we treat 'message' as the new input
-        # and 'history' as context if needed, but the graph mainly looks at the last message.
-        input_state = {
-            "messages": request.history + [request.message],
-            "current_intent": "",
-            "response": ""
-        }
+        input_state = await build_input_state(request, hospital, hospital_key)
         
-        # Invoke LangGraph
-        result = workflow_app.invoke(input_state)
+        # Run the graph on its async path so the event loop is never blocked
+        try:
+            start = time.perf_counter()
+            result = await runtime.graph_runner.ainvoke(input_state)
+            elapsed = time.perf_counter() - start
+            record_result("chat", result["current_intent"], result.get("topic", ""), elapsed)
+            log_conversation("chat", hospital_key, request, result, elapsed)
+        finally:
+            release()
         
         return ChatResponse(
             response=result["response"],
-            intent=result["current_intent"]
+            intent=result["current_intent"],
+            data_version=result.get("data_version", "")
         )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        record_error("chat", e)
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {e}")
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_chat_events(input_state: dict, release, request: ChatRequest, hospital_key: str):
+    """
+    Yields SSE frames while the graph runs: a `node` frame as each node finishes,
+    `intent` as soon as the guardian decides, the response as `chunk` frames, then `done`.
+    `release` frees the admission slot taken for the stream.
+    """
+    intent = topic = ""
+    data_version = ""
+    answered = False
+    try:
+        try:
+            start = time.perf_counter()
+            async for update in runtime.graph_runner.astream(input_state, stream_mode="updates"):
+                for node, values in update.items():
+                    values = values or {}
+                    yield sse_event("node", {"node": node})
+                    if "current_intent" in values:
+                        intent, topic = values["current_intent"], values.get("topic", "")
+                        yield sse_event("intent", {"intent": intent, "topic": topic})
+                    if values.get("response"):
+                        # One chunk per line keeps markdown lists intact while rendering
+                        for line in values["response"].splitlines(keepends=True):
+                            yield sse_event("chunk", {"text": line})
+                    data_version = values.get("data_version", data_version)
+                    answered = values.get("answered", answered)
+            # Includes time spent waiting on the client to read earlier frames
+            elapsed = time.perf_counter() - start
+            record_result("chat_stream", intent, topic, elapsed)
+            log_conversation("chat_stream", hospital_key, request,
+                             {"current_intent": intent, "topic": topic, "answered": answered,
+                              "data_version": data_version}, elapsed)
+        finally:
+            release()
+        yield sse_event("done", {"intent": intent, "data_version": data_version})
+    except Exception as e:
+        record_error("chat_stream", e)
+        traceback.print_exc()
+        yield sse_event("error", {"detail": f"{type(e).__name__}: {e}"})
+
+@app.post("/chat/stream")
+@app.post("/hospitals/{hospital_id}/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest, hospital: HospitalData = Depends(selected_hospital),
+                               hospital_key: str = Depends(requested_hospital)):
+    check_rate_limit(request)
+    # Admission happens before the response starts, so a shed stream is a plain 503
+    try:
+        release = await admission.admit(request_priority(request.message))
+    except Overloaded as e:
+        raise overloaded(e)
+    input_state = await build_input_state(request, hospital, hospital_key)
+    return StreamingResponse(
+        stream_chat_events(input_state, release, request, hospital_key),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Frees the slot if the body never ran, e.g. the client left before it started
+        background=BackgroundTask(release),
+    )
+
+@app.post("/chat/batch", response_model=List[BatchChatItem])
+@app.post("/hospitals/{hospital_id}/chat/batch", response_model=List[BatchChatItem])
+async def chat_batch_endpoint(items: List[Any] = Body(...), hospital: HospitalData = Depends(selected_hospital),
+                              hospital_key: str = Depends(requested_hospital)):
+    """
+    Answers a list of ChatRequest bodies in order. Items are validated one by one,
+    so a malformed or failing item only sets its own `error` field.
+    """
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_SIZE} items")
+
+    results: List[BatchChatItem] = [BatchChatItem() for _ in items]
+    valid = []
+    for i, item in enumerate(items):
+        try:
+            valid.append((i, ChatRequest.model_validate(item)))
+        except ValidationError as e:
+            err = e.errors()[0]
+            where = ".".join(str(part) for part in err["loc"])
+            results[i].error = f"Invalid request: {where + ': ' if where else ''}{err['msg']}"
+
+    # Batches are bulk traffic from kiosks and IVR queues and take one slot each,
+    # in the high lane if any item is medical or an emergency
+    priority = HIGH if any(request_priority(r.message) == HIGH for _, r in valid) else NORMAL
+    try:
+        async with admission.slot(priority):
+            # Only an admitted batch spends rate-limit tokens and touches session history
+            states, positions, chat_requests = [], [], []
+            for i, request in valid:
+                try:
+                    check_rate_limit(request)
+                except HTTPException as e:
+                    results[i].error = e.detail
+                    continue
+                states.append(await build_input_state(request, hospital, hospital_key))
+                positions.append(i)
+                chat_requests.append(request)
+
+            start = time.perf_counter()
+            # One synchronous pass over the whole batch, so it runs off the event loop
+            outcomes = await run_in_threadpool(runtime.run_batch, states)
+            # The batch is classified in one pass, so each item is charged an equal share
+            per_item = (time.perf_counter() - start) / max(1, len(states))
+    except Overloaded as e:
+        raise overloaded(e)
+
+    for i, request, outcome in zip(positions, chat_requests, outcomes):
+        if isinstance(outcome, Exception):
+            record_error("chat_batch", outcome)
+            results[i].error = f"{type(outcome).__name__}: {outcome}"
+        else:
+            record_result("chat_batch", outcome["current_intent"], outcome.get("topic", ""), per_item)
+            log_conversation("chat_batch", hospital_key, request, outcome, per_item)
+            results[i] = BatchChatItem(
+                response=outcome["response"],
+                intent=outcome["current_intent"],
+                data_version=outcome.get("data_version", "")
+            )
+    return results
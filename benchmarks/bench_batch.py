@@ -0,0 +1,47 @@
+"""
+Compares answering N questions through one /chat/batch call against N /chat calls.
+
+Runs in-process against the FastAPI app, so the numbers cover request parsing,
+graph execution and serialization but not network round trips; over a real
+network every /chat call would also pay its own round trip.
+"""
+import time
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+from fastapi.testclient import TestClient
+
+from main import app
+
+QUERIES = [
+    "What are the visiting hours?",
+    "How do I pay my bill?",
+    "Which doctors are available on Friday?",
+    "Where is the hospital located?",
+    "I have a headache",
+    "Can I speak to a human?",
+]
+
+
+def main():
+    with TestClient(app) as client:
+        print(f"{'batch size':>10} {'N x /chat ms':>14} {'/chat/batch ms':>16} {'speedup':>8}")
+        for n in (1, 10, 50, 100):
+            payloads = [{"message": QUERIES[i % len(QUERIES)]} for i in range(n)]
+            rounds = max(3, 300 // n)
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for p in payloads:
+                    client.post("/chat", json=p).raise_for_status()
+            single_ms = (time.perf_counter() - start) / rounds * 1e3
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                client.post("/chat/batch", json=payloads).raise_for_status()
+            batch_ms = (time.perf_counter() - start) / rounds * 1e3
+
+            print(f"{n:>10} {single_ms:>14.2f} {batch_ms:>16.2f} {single_ms / batch_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
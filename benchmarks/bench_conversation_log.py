@@ -0,0 +1,104 @@
+"""
+Conversation log costs: what a chat request pays to log its result (queueing a
+record vs writing a JSON line synchronously), background writer throughput and
+compression, drop counting once the queue is full, and a streaming analytics
+pass over many rotated segments.
+
+    python benchmarks/bench_conversation_log.py [records]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+from common import REPO_ROOT, time_per_call
+
+from app.conversation_log import ConversationLog, _as_dict, iter_records, segment_paths, summarize
+
+with open(os.path.join(REPO_ROOT, "benchmarks", "queries.json")) as f:
+    QUERIES = json.load(f)
+
+INTENTS = ("hospital_info",) * 9 + ("medical",)
+
+
+def fill(log: ConversationLog, n: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(n):
+        intent = rng.choice(INTENTS)
+        log.record("chat", "default", f"session-{i % 500}", rng.choice(QUERIES), intent, "",
+                   intent != "medical" and rng.random() > 0.05, "v1", rng.lognormvariate(-6, 0.5))
+
+
+def bench_hot_path(directory: str):
+    log = ConversationLog(directory, max_queue=10 ** 7)
+    record = lambda: log.record("chat", "default", "session", "What are the visiting hours?",
+                                "hospital_info", "visiting_hours", True, "v1", 0.002)
+    queued = time_per_call(record, number=20000, repeat=5)
+
+    # What logging inline in the endpoint would cost: one JSON line written per request
+    with open(os.path.join(directory, "sync.jsonl"), "a") as f:
+        def write_sync():
+            f.write(json.dumps({"ts": time.time(), "endpoint": "chat", "hospital": "default", "session": "session",
+                                "message": "What are the visiting hours?", "intent": "hospital_info",
+                                "topic": "visiting_hours", "answered": True, "data_version": "v1",
+                                "latency_ms": 2.0}, separators=(",", ":")) + "\n")
+            f.flush()
+        sync = time_per_call(write_sync, number=20000, repeat=5)
+    print(f"per request   queued record {queued:6.2f} us   synchronous JSON line + flush {sync:6.2f} us")
+
+
+def bench_writer(directory: str, n: int):
+    log = ConversationLog(directory, max_queue=n)
+    fill(log, n)
+    raw = sum(len(json.dumps(_as_dict(r), ensure_ascii=False, separators=(",", ":"))) + 1 for r in log._queue)
+    start = time.perf_counter()
+    log.flush()
+    log._close_segment()
+    elapsed = time.perf_counter() - start
+    size = sum(os.path.getsize(p) for p in segment_paths([directory]))
+    print(f"writer        {n / elapsed:10.0f} records/s   {size / n:5.1f} B/record on disk "
+          f"({raw / n:.0f} B raw, {raw / size:.1f}x)")
+
+
+def bench_overload(directory: str):
+    # No writer running: everything past max_queue is dropped and counted
+    log = ConversationLog(directory, max_queue=1000)
+    fill(log, 5000)
+    print(f"overload      5000 offered, {len(log)} queued, {log.dropped} dropped")
+
+
+def bench_analytics(directory: str, n: int):
+    # Small segments so the pass crosses many rotated files
+    log = ConversationLog(directory, segment_bytes=256 * 1024, max_queue=n, batch_size=2048)
+    for chunk in range(0, n, 50000):
+        fill(log, min(50000, n - chunk), seed=chunk)
+        log.flush()
+    log._close_segment()
+
+    start = time.perf_counter()
+    report = summarize(iter_records([directory]))
+    elapsed = time.perf_counter() - start
+    # Second pass under tracemalloc, which slows it down, for the memory high-water mark
+    tracemalloc.start()
+    summarize(iter_records([directory]))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"analytics     {report['records']} records in {log.segments} segments: {elapsed:.2f} s "
+          f"({report['records'] / elapsed:.0f} records/s), peak memory {peak / 1e6:.1f} MB")
+    print(f"              p50 {report['latency']['p50_ms']} ms  p99 {report['latency']['p99_ms']} ms  "
+          f"unanswered {report['unanswered']['rate']:.1%}")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("hot", "writer", "overload", "analytics"):
+            os.makedirs(os.path.join(tmp, name))
+        bench_hot_path(os.path.join(tmp, "hot"))
+        bench_writer(os.path.join(tmp, "writer"), n)
+        bench_overload(os.path.join(tmp, "overload"))
+        bench_analytics(os.path.join(tmp, "analytics"), n)
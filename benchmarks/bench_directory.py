@@ -0,0 +1,72 @@
+"""
+Lookup latency of the doctor/department directory index on a synthetic roster.
+
+Builds rosters of up to 10k doctors and times targeted questions (name, typo,
+specialty, department) against the index, next to the old linear substring scan.
+"""
+import random
+import time
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+from common import latency_summary, time_per_call
+from app.directory import DirectoryIndex
+
+FIRST = ["Sarah", "James", "Priya", "Chen", "Maria", "Omar", "Elena", "David", "Aisha", "Lucas",
+         "Grace", "Mateo", "Yuki", "Noah", "Fatima", "Ivan", "Zara", "Kofi", "Lena", "Raj"]
+SPECIALTIES = ["Cardiologist", "Orthopedic Surgeon", "Pediatrician", "Neurologist", "Dermatologist",
+               "Oncologist", "Radiologist", "Psychiatrist", "Urologist", "Endocrinologist"]
+DAYS = ["Mon, Wed, Fri", "Tue, Thu", "Mon-Fri", "Sat, Sun", "Wed, Fri"]
+HOURS = ["9AM - 1PM", "10AM - 2PM", "1PM - 5PM", "8AM - 4PM"]
+
+
+def synthetic_surname(rng: random.Random) -> str:
+    syllables = ["ka", "lo", "mi", "ra", "ten", "vor", "shi", "dan", "bel", "gor", "ni", "sto", "wen", "ar"]
+    return "".join(rng.choice(syllables) for _ in range(rng.randint(2, 3))).title()
+
+
+def build_roster(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    doctors = [{
+        "name": f"Dr. {rng.choice(FIRST)} {synthetic_surname(rng)}",
+        "specialty": rng.choice(SPECIALTIES),
+        "availability": f"{rng.choice(DAYS)}: {rng.choice(HOURS)}",
+    } for _ in range(n)]
+    departments = [{"name": s.replace("ist", "y"), "location": f"Wing {i}", "head": doctors[i]["name"]}
+                   for i, s in enumerate(SPECIALTIES)]
+    return doctors, departments
+
+
+def main():
+    print(f"{'doctors':>8} {'build ms':>9} {'p50 us':>8} {'p99 us':>8} {'max us':>8} {'linear scan us':>15}")
+    for n in (100, 1000, 10000):
+        doctors, departments = build_roster(n)
+        start = time.perf_counter()
+        index = DirectoryIndex(doctors, departments)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        surname = doctors[n // 2]["name"].split()[-1]
+        typo = surname[:-2] + surname[-1]
+        questions = [
+            f"Is Dr. {surname} in on Friday?",
+            f"When is doctor {doctors[3]['name'].split()[1]} {doctors[3]['name'].split()[2]} available?",
+            f"Dr {typo}",
+            "Is there a pediatrician available?",
+            "Where is the cardiology department?",
+            "What are the visiting hours?",
+        ]
+        samples = []
+        for _ in range(200):
+            for q in questions:
+                start = time.perf_counter()
+                index.match_message(q)
+                samples.append(time.perf_counter() - start)
+        s = latency_summary(samples)
+
+        needle = surname.lower()
+        linear_us = time_per_call(lambda: [d for d in doctors if needle in d["name"].lower()], number=20)
+        print(f"{n:>8} {build_ms:>9.1f} {s['p50_ms'] * 1e3:>8.1f} {s['p99_ms'] * 1e3:>8.1f} "
+              f"{max(samples) * 1e6:>8.1f} {linear_us:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
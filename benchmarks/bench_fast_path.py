@@ -0,0 +1,96 @@
+"""
+Checks that the fast path answers exactly like the LangGraph reference path, then
+reports the per-request cost of each.
+
+Exits non-zero if any query in the corpus gets a different response or intent, or
+if a day or time question gets the doctor roster when it shouldn't (or the reverse),
+so it can gate changes to graph.py or fast_path.py.
+"""
+import asyncio
+import json
+import os
+import sys
+
+from common import REPO_ROOT, time_per_call
+from app.graph import app as graph_app, fast_app
+
+with open(os.path.join(REPO_ROOT, "benchmarks", "queries.json")) as f:
+    QUERIES = json.load(f)
+
+# Day and time questions that are not about the roster, and ones that are
+NOT_ROSTER_QUERIES = [
+    "Who is in charge of billing today?",
+    "Which insurance is accepted in the clinic on Monday?",
+    "Any parking available on Sunday?",
+    "Which visiting hours are in effect today?",
+]
+ROSTER_QUERIES = [
+    "is anyone in on monday",
+    "Who is in on Friday?",
+    "Which doctors are in on Friday?",
+]
+QUERIES = QUERIES + NOT_ROSTER_QUERIES + ROSTER_QUERIES
+
+ROSTER_ANSWERS = ("Doctors available ", "No doctors are scheduled ")
+
+COMPARED_KEYS = ("response", "current_intent", "topic", "data_version")
+
+
+def initial_state(query: str) -> dict:
+    return {"messages": [query], "current_intent": "", "topic": "", "response": "", "data_version": ""}
+
+
+def check_equivalence() -> int:
+    mismatches = 0
+    for query in QUERIES:
+        reference = graph_app.invoke(initial_state(query))
+        candidates = {
+            "invoke": fast_app.invoke(initial_state(query)),
+            "ainvoke": asyncio.run(fast_app.ainvoke(initial_state(query))),
+        }
+        for mode, result in candidates.items():
+            diff = [k for k in COMPARED_KEYS if result.get(k) != reference.get(k)]
+            if diff:
+                mismatches += 1
+                print(f"MISMATCH ({mode}) {query!r}: {', '.join(diff)}")
+
+    async def collect(runner, query):
+        return [u async for u in runner.astream(initial_state(query), stream_mode="updates")]
+
+    for query in QUERIES:
+        if asyncio.run(collect(fast_app, query)) != asyncio.run(collect(graph_app, query)):
+            mismatches += 1
+            print(f"MISMATCH (astream) {query!r}")
+
+    for query in NOT_ROSTER_QUERIES + ROSTER_QUERIES:
+        is_roster = fast_app.invoke(initial_state(query))["response"].startswith(ROSTER_ANSWERS)
+        if is_roster != (query in ROSTER_QUERIES):
+            mismatches += 1
+            print(f"MISMATCH (roster) {query!r}: {'roster' if is_roster else 'no roster'} answer")
+    return mismatches
+
+
+def main():
+    if fast_app is None:
+        print("fast path unavailable: graph topology changed")
+        sys.exit(1)
+
+    mismatches = check_equivalence()
+    print(f"equivalence: {len(QUERIES)} queries, {mismatches} mismatches")
+
+    def run(runner):
+        for q in QUERIES:
+            runner.invoke(initial_state(q))
+
+    n = len(QUERIES)
+    graph_us = time_per_call(lambda: run(graph_app), number=20) / n
+    fast_us = time_per_call(lambda: run(fast_app), number=500) / n
+    print(f"{'path':>8} {'us/request':>12}")
+    print(f"{'graph':>8} {graph_us:>12.1f}")
+    print(f"{'fast':>8} {fast_us:>12.1f}")
+    print(f"LangGraph overhead per request: {graph_us - fast_us:.1f} us")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
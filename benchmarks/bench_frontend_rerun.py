@@ -0,0 +1,47 @@
+"""
+Measures Streamlit script rerun time per chat message.
+
+Starts the backend, then drives frontend/app.py headlessly with Streamlit's
+AppTest: each chat message triggers one script run, which renders the answer
+in place and is what a user waits on.
+"""
+import os
+import time
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+from common import REPO_ROOT, latency_summary
+from load_chat import start_server
+
+from streamlit.testing.v1 import AppTest
+
+MESSAGES = ["What are the visiting hours?", "How do I pay my bill?", "Where is cardiology?", "I have a fever"]
+
+
+def main(turns: int = 20):
+    # The frontend talks to the fixed port 8000
+    proc = start_server(8000)
+    try:
+        at = AppTest.from_file(os.path.join(REPO_ROOT, "frontend", "app.py"), default_timeout=30).run()
+
+        idle = []
+        for _ in range(turns):
+            start = time.perf_counter()
+            at.run()
+            idle.append(time.perf_counter() - start)
+
+        per_message = []
+        for i in range(turns):
+            start = time.perf_counter()
+            at.chat_input[0].set_value(MESSAGES[i % len(MESSAGES)]).run()
+            per_message.append(time.perf_counter() - start)
+
+        for label, samples in (("idle rerun", idle), ("chat message", per_message)):
+            s = latency_summary(samples)
+            print(f"{label:>14}: mean {s['mean_ms']:.1f} ms  p50 {s['p50_ms']:.1f} ms  p95 {s['p95_ms']:.1f} ms")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Accuracy and speed of the guardian engines on the labelled evaluation set.
+
+Reports precision/recall of the keyword rule, of the linear model alone at a few
+thresholds, and of the linear engine as served (model or keyword rule), then
+per-message latency and batch throughput of both engines.
+"""
+import json
+import os
+import time
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+from common import REPO_ROOT, latency_summary
+from app.classifier import Guardian, LinearGuardian
+from app.intents import MEDICAL_INTENT, intent_matcher
+
+EVAL_FILE = os.path.join(REPO_ROOT, "benchmarks", "guardian_eval.jsonl")
+
+
+def load_eval():
+    with open(EVAL_FILE) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return [r["text"] for r in records], [bool(r["medical"]) for r in records]
+
+
+def report(name, predicted, labels):
+    tp = sum(p and l for p, l in zip(predicted, labels))
+    fp = sum(p and not l for p, l in zip(predicted, labels))
+    fn = sum(l and not p for p, l in zip(predicted, labels))
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    print(f"{name:>16} {precision:>10.2f} {recall:>8.2f} {fp:>5} {fn:>5}")
+
+
+def main():
+    texts, labels = load_eval()
+
+    start = time.perf_counter()
+    model = LinearGuardian.from_file()
+    print(f"linear model trained in {(time.perf_counter() - start) * 1e3:.0f} ms\n")
+
+    print(f"{'engine':>16} {'precision':>10} {'recall':>8} {'FP':>5} {'FN':>5}")
+    report("keyword", [intent_matcher.classify(t).intent == MEDICAL_INTENT for t in texts], labels)
+    scores = model.scores(texts)
+    for threshold in (0.3, 0.5, 0.7):
+        report(f"model@{threshold}", list(scores >= threshold), labels)
+
+    engines = {"keyword": Guardian(intent_matcher), "linear": Guardian(intent_matcher, model)}
+    report("linear engine", [v.intent == MEDICAL_INTENT for v in engines["linear"].classify_many(texts)], labels)
+
+    print(f"\n{'engine':>8} {'p50 us':>8} {'p99 us':>8}   (one message per call)")
+    for name, engine in engines.items():
+        samples = []
+        for _ in range(20):
+            for text in texts:
+                start = time.perf_counter()
+                engine.classify(text)
+                samples.append(time.perf_counter() - start)
+        summary = latency_summary(samples)
+        print(f"{name:>8} {summary['p50_ms'] * 1e3:>8.1f} {summary['p99_ms'] * 1e3:>8.1f}")
+
+    print(f"\n{'batch':>6} {'keyword msg/s':>14} {'linear msg/s':>13}")
+    for size in (1, 16, 64, 256):
+        batch = (texts * (size // len(texts) + 1))[:size]
+        rates = []
+        for engine in engines.values():
+            rounds = max(5, 2000 // size)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                engine.classify_many(batch)
+            rates.append(rounds * size / (time.perf_counter() - start))
+        print(f"{size:>6} {rates[0]:>14.0f} {rates[1]:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
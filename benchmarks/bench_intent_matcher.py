@@ -0,0 +1,109 @@
+"""
+Micro-benchmark for the guardian/topic intent matcher.
+
+First checks that the matcher refuses every message the original substring rule
+refused (exits 1 if one gets through). Then grows synthetic keyword tables from
+tens to thousands of entries and reports the per-message classification cost,
+next to the old `any(word in message ...)` substring scan for comparison.
+"""
+import json
+import os
+import random
+import string
+import sys
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+from common import REPO_ROOT, time_per_call
+from app.intents import MEDICAL_INTENT, IntentMatcher, intent_matcher
+
+# The original guardian: a message was medical if it contained any of these as a substring
+BASELINE_MEDICAL = ["pain", "symptom", "hurt", "dose", "pill", "headache", "fever", "diagnosis",
+                    "bleed", "broken", "itch", "swelling", "burn", "infection", "virus"]
+
+# Inflections and compounds that the substring rule caught inside longer words
+REFUSED_PHRASES = [
+    "My eye is burning",
+    "Can I take painkillers?",
+    "can I overdose on tylenol",
+    "I have fevers at night",
+    "my skin itches",
+    "are viruses going around the ward",
+    "what do my diagnoses mean",
+    "what is the dosing for ibuprofen",
+    "I keep getting nosebleeds",
+    "bad heartburn after dinner",
+    "how do I treat a sunburn",
+    "my back hurts when I sit",
+    "is this pill safe",
+    "my symptoms got worse",
+]
+
+MESSAGES = [
+    "What are the visiting hours on Sunday?",
+    "How do I pay my bill with insurance?",
+    "I have a bad headache and a fever",
+    "Where is the cardiology department located?",
+    "Can I speak to a human representative please?",
+    "Is there parking near the Burnside entrance?",
+]
+
+
+def synthetic_words(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10))) for _ in range(count)]
+
+
+def build_table(size: int) -> dict:
+    medical = ["pain", "headache", "fever", "burn"] + synthetic_words(size, seed=1)
+    topics = [
+        {"name": "visiting_hours", "keywords": ["hours", "visiting"] + synthetic_words(size, seed=2)},
+        {"name": "billing", "keywords": ["bill", "pay", "insurance"] + synthetic_words(size, seed=3)},
+        {"name": "location", "keywords": ["where", "located"] + synthetic_words(size, seed=4)},
+    ]
+    return {"medical": medical, "topics": topics}
+
+
+def check_baseline_refusals() -> int:
+    """Messages the substring rule refused that the matcher answers; 0 is required."""
+    corpus = list(REFUSED_PHRASES) + MESSAGES
+    for name in ("benchmarks/guardian_eval.jsonl", "data/guardian_training.jsonl"):
+        with open(os.path.join(REPO_ROOT, name)) as f:
+            corpus.extend(json.loads(line)["text"] for line in f if line.strip())
+    with open(os.path.join(REPO_ROOT, "benchmarks", "queries.json")) as f:
+        corpus.extend(json.load(f))
+
+    refused = [m for m in corpus if any(word in m.lower() for word in BASELINE_MEDICAL)]
+    leaks = [m for m in refused if intent_matcher.classify(m).intent != MEDICAL_INTENT]
+    for message in leaks:
+        print(f"LEAK {message!r}: refused by the substring rule, answered by the matcher")
+    print(f"baseline refusals: {len(refused)} messages, {len(leaks)} answered by the matcher\n")
+    return len(leaks)
+
+
+def main():
+    if check_baseline_refusals():
+        sys.exit(1)
+
+    print(f"{'keywords':>10} {'matcher us/msg':>16} {'substring us/msg':>18}")
+    for size in (10, 100, 1000, 5000):
+        table = build_table(size)
+        matcher = IntentMatcher(table)
+        all_words = table["medical"] + [w for t in table["topics"] for w in t["keywords"]]
+
+        def run_matcher():
+            for m in MESSAGES:
+                matcher.classify(m)
+
+        def run_substring():
+            for m in MESSAGES:
+                lowered = m.lower()
+                any(word in lowered for word in all_words)
+
+        n = len(MESSAGES)
+        matcher_us = time_per_call(run_matcher, number=2000) / n
+        substring_us = time_per_call(run_substring, number=max(1, 20000 // len(all_words))) / n
+        print(f"{len(all_words):>10} {matcher_us:>16.2f} {substring_us:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Per-request cost of the built-in instrumentation.
+
+Times each graph node with and without its `timed_node` wrapper, the result and
+intent counters recorded per /chat call, and rendering /metrics.
+"""
+import common  # noqa: F401  (puts backend/ on sys.path)
+from common import time_per_call
+from app.graph import guardian_node, hospital_expert_node, medical_refusal_node
+from app.metrics import metrics, record_result
+
+STATE = {"messages": ["What are the visiting hours?"], "current_intent": "", "topic": "visiting_hours",
+         "response": "", "data_version": ""}
+
+
+def main():
+    print(f"{'node':>22} {'bare us':>9} {'timed us':>9} {'overhead us':>12}")
+    overheads = []
+    for node in (guardian_node, medical_refusal_node, hospital_expert_node):
+        bare = time_per_call(lambda: node.__wrapped__(STATE), number=20000)
+        timed = time_per_call(lambda: node(STATE), number=20000)
+        print(f"{node.__name__:>22} {bare:>9.2f} {timed:>9.2f} {timed - bare:>12.2f}")
+        overheads.append(max(0.0, timed - bare))
+    # Every request runs the guardian and one of the other two nodes
+    per_request = 2 * sum(overheads) / len(overheads)
+
+    counters = time_per_call(lambda: record_result("chat", "hospital_info", "visiting_hours", 0.0001), number=50000)
+    print(f"\nrecord_result: {counters:.2f} us")
+    print(f"instrumentation per request (2 nodes + counters): ~{per_request + counters:.2f} us")
+    print(f"render /metrics: {time_per_call(metrics.render, number=200):.0f} us")
+
+
+if __name__ == "__main__":
+    main()
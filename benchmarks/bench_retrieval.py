@@ -0,0 +1,58 @@
+"""
+Latency of the TF-IDF retrieval fallback on large synthetic directories.
+
+Reports index build time, a rebuild after one record changes (copying the rows
+of unchanged facts and recomputing IDF and normalization), and p50/p99 search
+latency for a mix of fallback-style questions.
+"""
+import json
+import os
+import time
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+from common import REPO_ROOT, latency_summary
+from bench_directory import build_roster
+from app.retrieval import RetrievalIndex
+
+QUESTIONS = [
+    "Where can I park?",
+    "What is the emergency contact number?",
+    "patient advocacy phone",
+    "Who is the head of oncology?",
+    "Is there a dermatologist on weekends?",
+    "Where is the cafeteria?",
+    "billing department number",
+    "radiology wing location",
+]
+
+
+def main():
+    with open(os.path.join(REPO_ROOT, "data", "hospital_info.json")) as f:
+        base = json.load(f)
+
+    print(f"{'facts':>7} {'build ms':>9} {'rebuild ms':>11} {'p50 us':>8} {'p99 us':>8}")
+    for n in (1000, 10000, 50000):
+        doctors, departments = build_roster(n)
+        data = dict(base, doctors=doctors, departments=base["departments"] + departments)
+
+        start = time.perf_counter()
+        index = RetrievalIndex.from_data(data)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        changed = dict(data, doctors=doctors[:-1] + [dict(doctors[-1], availability="Sat: 9AM - 1PM")])
+        start = time.perf_counter()
+        RetrievalIndex.from_data(changed, previous=index)
+        rebuild_ms = (time.perf_counter() - start) * 1e3
+
+        samples = []
+        for _ in range(200):
+            for q in QUESTIONS:
+                start = time.perf_counter()
+                index.search(q, k=3)
+                samples.append(time.perf_counter() - start)
+        s = latency_summary(samples)
+        print(f"{len(index.facts):>7} {build_ms:>9.1f} {rebuild_ms:>11.1f} {s['p50_ms'] * 1e3:>8.1f} {s['p99_ms'] * 1e3:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
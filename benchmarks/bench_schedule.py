@@ -0,0 +1,50 @@
+"""
+Bulk "who is available now" queries over a large roster.
+
+Compares the RosterAvailability interval index against checking each doctor's
+parsed WeeklySchedule one by one, and against re-parsing every availability
+string per query (what answering from the raw strings would cost).
+"""
+import datetime
+import random
+import time
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+from common import time_per_call
+from bench_directory import build_roster
+from app.schedule import RosterAvailability, WeeklySchedule
+
+
+def main():
+    rng = random.Random(3)
+    base = datetime.datetime(2026, 10, 12)  # a Monday
+    moments = [base + datetime.timedelta(minutes=rng.randrange(7 * 24 * 60)) for _ in range(50)]
+
+    print(f"{'doctors':>8} {'parse ms':>9} {'index us/query':>15} {'per-doctor us':>14} {'re-parse us':>12}")
+    for n in (1000, 10000, 100000):
+        doctors, _ = build_roster(n)
+        start = time.perf_counter()
+        schedules = [WeeklySchedule.parse(d["availability"]) for d in doctors]
+        roster = RosterAvailability(schedules)
+        parse_ms = (time.perf_counter() - start) * 1e3
+
+        it = iter(range(10 ** 9))
+        index_us = time_per_call(lambda: roster.available_at(moments[next(it) % 50]), number=500)
+        per_doctor_us = time_per_call(
+            lambda: [i for i, s in enumerate(schedules) if s.is_open(moments[next(it) % 50])],
+            number=3, repeat=3)
+        reparse_us = time_per_call(
+            lambda: [i for i, d in enumerate(doctors)
+                     if WeeklySchedule.parse(d["availability"]).is_open(moments[next(it) % 50])],
+            number=1, repeat=2) if n <= 10000 else float("nan")
+
+        # Cross-check the index against the straightforward answer
+        for when in moments[:5]:
+            expected = [i for i, s in enumerate(schedules) if s.is_open(when)]
+            assert roster.available_at(when).tolist() == expected
+
+        print(f"{n:>8} {parse_ms:>9.1f} {index_us:>15.1f} {per_doctor_us:>14.1f} {reparse_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Startup time and per-worker memory: hospital data parsed from JSON versus
+memory-mapped from a compiled snapshot (app.binary_snapshot).
+
+For synthetic rosters of increasing size this script
+
+- checks that both loaders answer the query corpus identically,
+- starts WORKERS processes per loader that each build a HospitalData and stay
+  alive together, like uvicorn workers, and reports their load time, RSS and
+  PSS. PSS splits shared pages between the processes mapping them, so it is the
+  figure that shows the snapshot's pages being shared.
+
+    python benchmarks/bench_snapshot.py
+"""
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+from common import BACKEND_DIR, REPO_ROOT
+from bench_directory import build_roster
+
+WORKERS = 4
+SIZES = (1000, 10000, 100000)
+
+# Runs in each worker: load, report, then wait so all workers are measured together
+WORKER = """
+import json, sys, time
+start = time.perf_counter()
+from app.hospital_data import HospitalData
+data = HospitalData(sys.argv[1])
+load_ms = (time.perf_counter() - start) * 1e3
+mem = {}
+with open("/proc/self/smaps_rollup") as f:
+    for line in f:
+        key, _, rest = line.partition(":")
+        if key in ("Rss", "Pss"):
+            mem[key.lower()] = int(rest.split()[0]) / 1024
+print(json.dumps({"load_ms": load_ms, "doctors": len(data.data["doctors"]), **mem}), flush=True)
+sys.stdin.readline()
+print(json.dumps({"pss": [int(l.split()[1]) / 1024 for l in open("/proc/self/smaps_rollup") if l.startswith("Pss:")][0]}), flush=True)
+"""
+
+
+def write_hospital(directory: str, n: int) -> str:
+    with open(os.path.join(REPO_ROOT, "data", "hospital_info.json")) as f:
+        data = json.load(f)
+    data["doctors"], data["departments"] = build_roster(n)
+    path = os.path.join(directory, "hospital.json")
+    with open(path, "w") as f:
+        json.dump(data, f)
+    return path
+
+
+def check_equivalent(json_path: str, snap_dir: str) -> int:
+    from app.hospital_data import HospitalData
+    from app.graph import hospital_expert_node, medical_refusal_node, guardian
+
+    with open(os.path.join(REPO_ROOT, "benchmarks", "queries.json")) as f:
+        queries = json.load(f)
+    from_json = HospitalData(json_path).snapshot
+    from_snap = HospitalData(os.path.join(snap_dir, "hospital.json")).snapshot
+    assert from_json.content_hash == from_snap.content_hash
+    assert type(from_snap.data["doctors"]).__name__ == "RecordTable", "snapshot was not used"
+
+    mismatches = 0
+    for section in ("general_info", "departments", "doctors", "billing_info"):
+        mismatches += from_json.get_rendered_bytes(section) != from_snap.get_rendered_bytes(section)
+    names = [d["name"] for d in from_json.data["doctors"][:50:7]]
+    for query in queries + names:
+        mismatches += from_json.get_doctor_by_name(query) != from_snap.get_doctor_by_name(query)
+        intent, topic = guardian.classify(query)
+        for node in (hospital_expert_node, medical_refusal_node):
+            answers = [node({"messages": [query], "current_intent": intent, "topic": topic or "",
+                             "response": "", "data_version": "", "hospital": snap})["response"]
+                       for snap in (from_json, from_snap)]
+            mismatches += answers[0] != answers[1]
+    return mismatches
+
+
+def run_workers(path: str):
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    procs = [subprocess.Popen([sys.executable, "-c", WORKER, path], cwd=BACKEND_DIR, env=env,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+             for _ in range(WORKERS)]
+    reports = [json.loads(p.stdout.readline()) for p in procs]
+    # Every worker is loaded now; PSS read at this point splits the shared pages
+    for p in procs:
+        p.stdin.write("\n")
+        p.stdin.flush()
+    for p, report in zip(procs, reports):
+        report["pss"] = json.loads(p.stdout.readline())["pss"]
+        p.wait()
+    return reports
+
+
+def main():
+    from app.binary_snapshot import compile_snapshot
+
+    print(f"{WORKERS} workers per loader; memory is per worker, after loading\n")
+    print(f"{'doctors':>8} {'loader':>8} {'file MB':>8} {'compile ms':>11} {'load ms':>8} "
+          f"{'RSS MB':>7} {'PSS MB':>7} {'mismatches':>11}")
+    for n in SIZES:
+        with tempfile.TemporaryDirectory() as json_dir, tempfile.TemporaryDirectory() as snap_dir:
+            json_path = write_hospital(json_dir, n)
+            snap_json = shutil.copy(json_path, os.path.join(snap_dir, "hospital.json"))
+            start = time.perf_counter()
+            snap_path = compile_snapshot(snap_json)
+            compile_ms = (time.perf_counter() - start) * 1e3
+            mismatches = check_equivalent(json_path, snap_dir)
+
+            for loader, path, size, built in (("json", json_path, os.path.getsize(json_path), ""),
+                                              ("snapshot", snap_json, os.path.getsize(snap_path), f"{compile_ms:.0f}")):
+                reports = run_workers(path)
+                assert all(r["doctors"] == n for r in reports)
+                print(f"{n:>8} {loader:>8} {size / 2**20:>8.1f} {built:>11} "
+                      f"{statistics.median(r['load_ms'] for r in reports):>8.0f} "
+                      f"{statistics.median(r['rss'] for r in reports):>7.1f} "
+                      f"{statistics.median(r['pss'] for r in reports):>7.1f} "
+                      f"{mismatches if loader == 'snapshot' else '':>11}")
+
+
+if __name__ == "__main__":
+    main()
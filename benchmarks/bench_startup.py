@@ -0,0 +1,97 @@
+"""
+Backend cold start: how long `import main` takes in a fresh interpreter, and how
+long a fresh uvicorn process takes to pass /healthz (accepting connections) and
+/readyz (graph compiled, data loaded).
+
+Exits non-zero if `import main` pulls in any of DEFERRED_MODULES, which belong
+in the background warm-up (app.runtime), not on the path to accepting connections.
+
+    python benchmarks/bench_startup.py
+"""
+import json
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+from common import BACKEND_DIR, latency_summary
+from load_chat import free_port
+
+# Imported by the warm-up thread only
+DEFERRED_MODULES = ("langgraph", "langchain_core", "app.graph", "app.classifier")
+
+_IMPORT_MAIN = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def import_main() -> Tuple[float, List[str]]:
+    """Seconds to import main in a fresh interpreter, and the deferred modules it loaded."""
+    out = subprocess.run([sys.executable, "-c", _IMPORT_MAIN], cwd=BACKEND_DIR,
+                         capture_output=True, text=True, check=True).stdout
+    report = json.loads(out.strip().splitlines()[-1])
+    eager = [m for m in DEFERRED_MODULES if m in report["modules"]]
+    return report["seconds"], eager
+
+
+def server_start() -> Dict[str, float]:
+    """Milliseconds from spawning uvicorn until /healthz, then /readyz, answer 200."""
+    port = free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    times = {}
+    try:
+        for probe in ("healthz", "readyz"):
+            deadline = time.time() + 60
+            while True:
+                try:
+                    if httpx.get(f"http://127.0.0.1:{port}/{probe}", timeout=0.5).status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if time.time() > deadline:
+                    raise RuntimeError(f"backend never passed /{probe}")
+                time.sleep(0.01)
+            times[f"{'live' if probe == 'healthz' else 'ready'}_ms"] = (time.perf_counter() - start) * 1e3
+    finally:
+        proc.terminate()
+        proc.wait()
+    return times
+
+
+def run(import_repeat: int = 5, server_repeat: int = 3) -> Tuple[Dict[str, Dict[str, float]], List[str]]:
+    samples, eager = [], []
+    for _ in range(import_repeat):
+        seconds, eager = import_main()
+        samples.append(seconds)
+    starts = [server_start() for _ in range(server_repeat)]
+    results = {
+        "startup.import_main": latency_summary(samples),
+        "startup.uvicorn": {key: sorted(s[key] for s in starts)[len(starts) // 2] for key in starts[0]},
+    }
+    return results, eager
+
+
+def main():
+    results, eager = run()
+    imports = results["startup.import_main"]
+    print(f"import main      p50 {imports['p50_ms']:7.0f} ms   max {imports['p99_ms']:7.0f} ms")
+    server = results["startup.uvicorn"]
+    print(f"uvicorn /healthz     {server['live_ms']:7.0f} ms")
+    print(f"uvicorn /readyz      {server['ready_ms']:7.0f} ms")
+    if eager:
+        print(f"\n`import main` loads {', '.join(eager)} eagerly; move it into the warm-up")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
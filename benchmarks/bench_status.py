@@ -0,0 +1,79 @@
+"""
+Live-status costs: applying a pushed update (ring-buffer write plus rolling
+aggregates and the prebuilt body), and serving /status polls with and without a
+matching If-None-Match, in-process through an ASGI transport.
+
+    python benchmarks/bench_status.py
+"""
+import asyncio
+import time
+
+import httpx
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+from common import latency_summary, time_per_call
+
+POLLS = 2000
+CONCURRENCY = 32
+
+
+def bench_update():
+    from app.live_status import HospitalStatus
+
+    print(f"{'samples':>8} {'metrics':>8} {'update us':>10}")
+    for capacity in (256, 2048, 8192):
+        status = HospitalStatus("bench", capacity=capacity)
+        now = time.time() - capacity * 60
+        clock = iter(range(10 ** 9))
+        update = {"er_wait_minutes": 20.0, "icu_occupancy_pct": 80.0, "oncall_doctors": 6.0}
+        # Fill the rings first so aggregates run over full buffers
+        for i in range(capacity):
+            status.update(update, {}, now + i * 60)
+        # Then keep pushing just after the last sample, staying clear of the clock-skew check
+        last = now + capacity * 60
+        us = time_per_call(lambda: status.update(update, {"Radiology": {"state": "busy"}}, last + next(clock) * 1e-3),
+                           number=200, repeat=3)
+        print(f"{capacity:>8} {len(update):>8} {us:>10.1f}")
+
+
+async def _poll(app, conditional: bool):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        first = await client.get("/status")
+        etag = first.headers["ETag"]
+        headers = {"If-None-Match": etag} if conditional else {}
+        latencies = []
+        counter = iter(range(POLLS))
+
+        async def loop():
+            for _ in counter:
+                start = time.perf_counter()
+                r = await client.get("/status", headers=headers)
+                latencies.append(time.perf_counter() - start)
+                assert r.status_code == (304 if conditional else 200)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(loop() for _ in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - start
+    return latency_summary(latencies), POLLS / elapsed, 0 if conditional else len(first.content)
+
+
+def bench_polls():
+    from main import app, status_board
+
+    status = status_board.for_update("default")
+    start = time.time() - 2048 * 60
+    for i in range(2048):
+        status.update({"er_wait_minutes": 15 + i % 20, "icu_occupancy_pct": 70 + i % 25, "oncall_doctors": 6},
+                      {f"Department {d}": {"state": "open"} for d in range(20)}, start + i * 60)
+
+    print(f"\n{'poll':>12} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8} {'body B':>7}")
+    for conditional in (False, True):
+        summary, rps, size = asyncio.run(_poll(app, conditional))
+        name = "304 (etag)" if conditional else "200 (full)"
+        print(f"{name:>12} {summary['p50_ms']:>8.2f} {summary['p99_ms']:>8.2f} {rps:>8.0f} {size:>7}")
+
+
+if __name__ == "__main__":
+    bench_update()
+    bench_polls()
@@ -0,0 +1,47 @@
+"""
+Shared helpers for the offline benchmark scripts.
+
+Benchmarks are plain scripts run from the repository root, e.g.
+`python benchmarks/bench_intent_matcher.py`. They import the backend the same
+way uvicorn does, with `backend/` on `sys.path`.
+"""
+import os
+import sys
+import time
+from typing import Callable, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(REPO_ROOT, "backend")
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def time_per_call(func: Callable[[], object], number: int = 10000, repeat: int = 5) -> float:
+    """Best-of-`repeat` mean wall time of `func()` in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1e6
+
+
+def latency_summary(samples_s: List[float]) -> Dict[str, float]:
+    """Summarize per-call latencies (in seconds) as milliseconds."""
+    ordered = sorted(samples_s)
+    return {
+        "count": len(ordered),
+        "mean_ms": (sum(ordered) / len(ordered) * 1e3) if ordered else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1e3,
+        "p95_ms": percentile(ordered, 95) * 1e3,
+        "p99_ms": percentile(ordered, 99) * 1e3,
+    }
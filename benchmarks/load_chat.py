@@ -0,0 +1,103 @@
+"""
+Concurrent load test for the /chat endpoint.
+
+Starts the backend under uvicorn in a subprocess (or targets `--url`) and drives
+it with an increasing number of concurrent clients, reporting throughput and
+latency percentiles for each level.
+
+    python benchmarks/load_chat.py --requests 400 --concurrency 1 4 16 64
+"""
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from common import BACKEND_DIR, latency_summary
+
+QUERIES = [
+    "What are the visiting hours?",
+    "How do I pay my bill?",
+    "Which doctors are available?",
+    "Where is the hospital located?",
+    "I have a headache",
+    "Can I speak to a human?",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            # Wait for the warm-up too, so it isn't counted in the first requests
+            if httpx.get(f"http://127.0.0.1:{port}/readyz", timeout=0.5).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("backend did not start")
+
+
+async def run_level(url: str, total: int, concurrency: int) -> dict:
+    latencies = []
+    counter = iter(range(total))
+
+    async def client_loop(client: httpx.AsyncClient):
+        for i in counter:
+            start = time.perf_counter()
+            r = await client.post(url, json={"message": QUERIES[i % len(QUERIES)]})
+            r.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    summary = latency_summary(latencies)
+    summary["throughput_rps"] = total / elapsed
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Existing /chat URL; a local server is started when omitted")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    proc = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        proc = start_server(port)
+        url = f"http://127.0.0.1:{port}/chat"
+
+    try:
+        print(f"{'clients':>8} {'req/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for level in args.concurrency:
+            s = asyncio.run(run_level(url, args.requests, level))
+            print(f"{level:>8} {s['throughput_rps']:>10.1f} {s['p50_ms']:>8.2f} {s['p95_ms']:>8.2f} {s['p99_ms']:>8.2f}")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Offline benchmark suite for the /chat pipeline, with JSON results for regression checks.
+
+Runs four groups, all but the last in-process:
+
+- micro: the graph nodes and each HospitalData getter
+- graph: `workflow_app.invoke` (LangGraph) and the fast path over the query corpus
+- http: a concurrent load generator against the FastAPI app through an ASGI
+  transport, replaying the mixed-intent corpus in `queries.json`
+- startup: `import main` in a fresh interpreter, and a fresh uvicorn's time to
+  pass /healthz and /readyz (see bench_startup.py)
+
+    python benchmarks/run_suite.py                        # writes benchmarks/results/<time>.json
+    python benchmarks/run_suite.py --output base.json
+    python benchmarks/run_suite.py --compare base.json    # exits 1 on a regression
+    python benchmarks/run_suite.py --compare base.json new.json
+
+Lower is better for every metric except `throughput_rps`.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+from common import REPO_ROOT, latency_summary, time_per_call
+
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+with open(os.path.join(REPO_ROOT, "benchmarks", "queries.json")) as f:
+    QUERIES: List[str] = json.load(f)
+
+HIGHER_IS_BETTER = {"throughput_rps"}
+
+# Metrics that describe the run rather than its speed
+IGNORED_METRICS = {"count"}
+
+# Changes smaller than this are timer noise whatever their percentage
+# (sub-microsecond getters easily swing by 50% between runs)
+NOISE_FLOOR = {"us_per_call": 0.5, "mean_ms": 0.05, "p50_ms": 0.05, "p95_ms": 0.05, "p99_ms": 0.05,
+               "live_ms": 50, "ready_ms": 50}
+
+
+def initial_state(query: str) -> dict:
+    return {"messages": [query], "current_intent": "", "topic": "", "response": "", "data_version": ""}
+
+
+def run_micro(quick: bool) -> Dict[str, Dict[str, float]]:
+    from app.graph import guardian_node, hospital_expert_node, medical_refusal_node, guardian
+    from app.hospital_data import hospital_data
+
+    number = 2000 if quick else 20000
+    results = {}
+
+    def bench(name: str, func: Callable[[], object], n: int = number):
+        results[f"micro.{name}"] = {"us_per_call": time_per_call(func, number=n, repeat=3 if quick else 5)}
+
+    # Node costs averaged over the corpus, with the guardian's verdict filled in
+    states = []
+    for query in QUERIES:
+        intent, topic = guardian.classify(query)
+        states.append({**initial_state(query), "current_intent": intent, "topic": topic or ""})
+    n_states = len(states)
+
+    def corpus(node):
+        def run():
+            for state in states:
+                node(state)
+        return run
+
+    bench("guardian_node", corpus(guardian_node), max(1, number // n_states))
+    bench("medical_refusal_node", corpus(medical_refusal_node), max(1, number // n_states))
+    bench("hospital_expert_node", corpus(hospital_expert_node), max(1, number // n_states))
+    for name in ("guardian_node", "medical_refusal_node", "hospital_expert_node"):
+        results[f"micro.{name}"]["us_per_call"] /= n_states
+
+    bench("HospitalData.get_general_info", hospital_data.get_general_info)
+    bench("HospitalData.get_departments", hospital_data.get_departments)
+    bench("HospitalData.get_doctors", hospital_data.get_doctors)
+    bench("HospitalData.get_billing_info", hospital_data.get_billing_info)
+    bench("HospitalData.get_doctor_by_name", lambda: hospital_data.get_doctor_by_name("heart"))
+    return results
+
+
+def run_graph(quick: bool) -> Dict[str, Dict[str, float]]:
+    from app.graph import app as workflow_app, fast_app
+
+    rounds = 5 if quick else 25
+    results = {}
+    runners = {"graph.workflow_app.invoke": workflow_app}
+    if fast_app is not None:
+        runners["graph.fast_app.invoke"] = fast_app
+    for name, runner in runners.items():
+        samples = []
+        for _ in range(rounds):
+            for query in QUERIES:
+                start = time.perf_counter()
+                runner.invoke(initial_state(query))
+                samples.append(time.perf_counter() - start)
+        results[name] = latency_summary(samples)
+    return results
+
+
+async def _load(app, total: int, concurrency: int) -> Dict[str, float]:
+    import httpx
+
+    latencies = []
+    failures = 0
+    counter = iter(range(total))
+
+    async def client_loop(client):
+        nonlocal failures
+        for i in counter:
+            start = time.perf_counter()
+            r = await client.post("/chat", json={"message": QUERIES[i % len(QUERIES)]})
+            latencies.append(time.perf_counter() - start)
+            if r.status_code != 200:
+                failures += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    summary = latency_summary(latencies)
+    summary["throughput_rps"] = total / elapsed
+    summary["failures"] = failures
+    return summary
+
+
+def run_http(quick: bool, concurrency: List[int]) -> Dict[str, Dict[str, float]]:
+    from main import app, runtime
+
+    # The ASGI transport skips the lifespan; warm up here so no request waits for it
+    runtime.load()
+    total = 200 if quick else 2000
+    return {f"http.chat.c{level}": asyncio.run(_load(app, total, level)) for level in concurrency}
+
+
+def run_startup(quick: bool) -> Dict[str, Dict[str, float]]:
+    import bench_startup
+
+    results, eager = bench_startup.run(import_repeat=3 if quick else 10, server_repeat=1 if quick else 3)
+    # Counted like failures, so --compare flags a module that became eager again
+    results["startup.import_main"]["failures"] = len(eager)
+    return results
+
+
+def metadata() -> Dict[str, str]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": str(os.cpu_count()),
+        "queries": str(len(QUERIES)),
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold_pct: float) -> List[str]:
+    """Prints a per-metric comparison and returns the regressions beyond `threshold_pct`."""
+    regressions = []
+    print(f"{'benchmark':<44} {'metric':<16} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, metrics in sorted(current["results"].items()):
+        base_metrics = baseline["results"].get(name)
+        if base_metrics is None:
+            continue
+        for metric, value in metrics.items():
+            base = base_metrics.get(metric)
+            if metric in IGNORED_METRICS or base is None:
+                continue
+            if metric == "failures":
+                if value > base:
+                    regressions.append(f"{name} {metric}")
+                    print(f"{name:<44} {metric:<16} {base:>12.0f} {value:>12.0f} {'':>9}  REGRESSION")
+                continue
+            if not base:
+                continue
+            change = (value - base) / base * 100
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = ""
+            if worse > threshold_pct and abs(value - base) > NOISE_FLOOR.get(metric, 0.0):
+                flag = "  REGRESSION"
+                regressions.append(f"{name} {metric}")
+            print(f"{name:<44} {metric:<16} {base:>12.2f} {value:>12.2f} {change:>+8.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", nargs="+", choices=["micro", "graph", "http", "startup"],
+                        default=["micro", "graph", "http", "startup"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations, for a smoke run")
+    parser.add_argument("--output", help="Where to write results (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", nargs="+", metavar="FILE",
+                        help="BASELINE [CURRENT]: compare a fresh run (or CURRENT) against BASELINE")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes a baseline and at most one current result file")
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+    else:
+        results = {}
+        if "micro" in args.groups:
+            results.update(run_micro(args.quick))
+        if "graph" in args.groups:
+            results.update(run_graph(args.quick))
+        if "http" in args.groups:
+            results.update(run_http(args.quick, args.concurrency))
+        if "startup" in args.groups:
+            results.update(run_startup(args.quick))
+        current = {"meta": metadata(), "results": results}
+
+        output = args.output
+        if output is None:
+            os.makedirs(RESULTS_DIR, exist_ok=True)
+            stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+            output = os.path.join(RESULTS_DIR, f"{stamp}.json")
+        with open(output, "w") as f:
+            json.dump(current, f, indent=2)
+        for name, metrics in results.items():
+            print(f"{name:<44} " + "  ".join(f"{k}={v:.2f}" for k, v in metrics.items() if k not in IGNORED_METRICS))
+        print(f"\nresults written to {output}")
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        print()
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:g}%")
+            sys.exit(1)
+        print(f"\nno regressions beyond {args.threshold:g}%")
+
+
+if __name__ == "__main__":
+    main()
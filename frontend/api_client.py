@@ -0,0 +1,160 @@
+import json
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the backend while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds. After that a single trial call is let through; its
+    outcome closes the circuit again or restarts the timeout.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError("Backend marked unavailable")
+            # Half-open: let this call through, keep others out until it finishes
+            self._opened_at = time.monotonic()
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class HospiBotClient:
+    """
+    Shared HTTP client for the backend: one keep-alive connection pool, connect and
+    read timeouts on every call, bounded retries and a circuit breaker.
+
+    Retries only cover failures where the backend never handled the request, such
+    as refused connections and 503 load shedding, so a chat turn is never recorded twice.
+    Load shedding (503 with Retry-After) and rate limiting (429) are the backend
+    working as intended, so they never count toward opening the circuit.
+    """
+
+    def __init__(self, base_url: str, connect_timeout: float = 3.05, read_timeout: float = 30.0,
+                 retries: int = 2, backoff_factor: float = 0.3, pool_size: int = 10,
+                 breaker: CircuitBreaker = None, hospital_id: Optional[str] = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker or CircuitBreaker()
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            status_forcelist=(503,),
+            allowed_methods=frozenset({"GET", "POST"}),
+            backoff_factor=backoff_factor,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if hospital_id:
+            # Selects the hospital on a backend that serves several
+            self.session.headers["X-Hospital-Id"] = hospital_id
+        # path -> (ETag, parsed body) of the last full response, for conditional GETs
+        self._etag_cache: Dict[str, Tuple[str, Dict]] = {}
+        self._etag_lock = threading.Lock()
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        self.breaker.before_call()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            self.breaker.record_failure()
+            raise
+        if response.status_code >= 500:
+            if not (response.status_code == 503 and "Retry-After" in response.headers):
+                self.breaker.record_failure()
+            response.raise_for_status()
+        return response
+
+    def get_json(self, path: str, **kwargs) -> Dict:
+        response = self._request("GET", path, **kwargs)
+        response.raise_for_status()
+        self.breaker.record_success()
+        return response.json()
+
+    def get_json_cached(self, path: str) -> Dict:
+        """
+        Like get_json, but revalidates the last response with If-None-Match, so an
+        unchanged resource costs the backend a 304 and no JSON is parsed again.
+        """
+        with self._etag_lock:
+            cached = self._etag_cache.get(path)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        response = self._request("GET", path, headers=headers)
+        if response.status_code == 304 and cached:
+            self.breaker.record_success()
+            return cached[1]
+        response.raise_for_status()
+        self.breaker.record_success()
+        body = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._etag_lock:
+                self._etag_cache[path] = (etag, body)
+        return body
+
+    def post_json(self, path: str, payload: Dict) -> Dict:
+        response = self._request("POST", path, json=payload)
+        response.raise_for_status()
+        self.breaker.record_success()
+        return response.json()
+
+    def stream_chat(self, payload: Dict) -> Iterator[str]:
+        """
+        Yields response text as /chat/stream sends it over Server-Sent Events.
+        """
+        with self._request("POST", "/chat/stream", json=payload, stream=True) as response:
+            response.raise_for_status()
+            event = None
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if line.startswith("event: "):
+                        event = line[len("event: "):]
+                    elif line.startswith("data: "):
+                        data = json.loads(line[len("data: "):])
+                        if event == "chunk":
+                            yield data["text"]
+                        elif event == "error":
+                            raise RuntimeError(data["detail"])
+            except requests.RequestException:
+                self.breaker.record_failure()
+                raise
+        self.breaker.record_success()
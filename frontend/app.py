@@ -1,12 +1,47 @@
 import streamlit as st
-import requests
 import uuid
 import datetime
-import random
+import html
+import json
+import os
+import textwrap
+import time
+import requests
 from typing import List, Dict
 
+from api_client import CircuitOpenError, HospiBotClient
+
 # Backend API URL
-API_URL = "http://127.0.0.1:8000/chat"
+API_BASE_URL = "http://127.0.0.1:8000"
+
+# Which hospital this portal serves when the backend hosts several; unset means the default one
+HOSPITAL_ID = os.environ.get("HOSPIBOT_HOSPITAL_ID")
+
+_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+DATA_FILE_PATH = (os.path.join(_DATA_DIR, "hospitals", f"{HOSPITAL_ID}.json") if HOSPITAL_ID
+                  else os.path.join(_DATA_DIR, "hospital_info.json"))
+
+# How often the Live Dashboard refreshes itself, independently of the chat
+DASHBOARD_REFRESH = "30s"
+
+# ER wait (minutes) and ICU occupancy (%) at which the dashboard turns amber, then red
+ER_WAIT_LEVELS = (20, 45)
+ICU_LEVELS = (75, 90)
+LEVEL_COLORS = ("#166534", "#EA580C", "#991B1B")
+
+DEPARTMENT_ICONS = {"Cardiology": "🫀", "Neurology": "🧠", "Orthopedics": "🦴",
+                    "Pediatrics": "👶", "Radiology": "☢️", "Pharmacy": "💊"}
+
+# Shown instead of a spinner that never ends when the backend is down
+DEGRADED_MESSAGE = ("⚠️ HospiBot is temporarily unavailable. Please try again in a minute. "
+                    "For urgent help call the hospital's emergency line, **555-0199**.")
+
+# Shown when the backend rate-limits this session (HTTP 429) or is shedding load (503)
+BUSY_MESSAGES = {
+    429: "⏳ You're sending messages faster than I can answer. Please wait a few seconds and try again.",
+    503: ("⏳ HospiBot is very busy right now. Please try again shortly. "
+          "For urgent help call the hospital's emergency line, **555-0199**."),
+}
 
 # --- CONFIG ---
 st.set_page_config(
@@ -155,6 +190,14 @@ st.markdown("""
         display: inline-block;
         margin-right: 5px;
     }
+    .status-dot-grey {
+        height: 10px;
+        width: 10px;
+        background-color: #94A3B8;
+        border-radius: 50%;
+        display: inline-block;
+        margin-right: 5px;
+    }
 
 </style>
 """, unsafe_allow_html=True)
@@ -170,27 +213,86 @@ if "messages" not in st.session_state:
 if "user_id" not in st.session_state:
     st.session_state.user_id = str(uuid.uuid4())
 
-def get_er_wait_time():
-    # Simulate meaningful data
-    return random.randint(10, 25)
+def get_live_status():
+    """
+    ER wait, capacity and department states pushed to the backend's /status.
+    Revalidated with its ETag, so an unchanged status costs a 304. Returns None
+    when the backend can't be reached.
+    """
+    try:
+        return get_api_client().get_json_cached("/status")
+    except Exception:
+        return None
+
+def _level(value: float, levels) -> int:
+    return sum(value >= bound for bound in levels)
 
-def is_business_hours():
-    now = datetime.datetime.now()
-    return 9 <= now.hour < 17
+def _updated_ago(timestamp) -> str:
+    minutes = int(max(0, time.time() - timestamp) // 60)
+    return "updated just now" if minutes == 0 else f"updated {minutes} min ago"
 
-def send_message(prompt):
-    st.session_state.messages.append({"role": "user", "content": prompt})
+def department_rows(live) -> Dict[str, List[Dict]]:
+    """
+    Departments grouped by wing, from the hospital data (e.g. "Wing A, 2nd Floor")
+    plus any others the live feed reports, each with its live state if any.
+    """
+    states = (live or {}).get("departments", {})
+    groups: Dict[str, List[Dict]] = {}
+    known = set()
+    for dept in load_hospital_info().get("departments", []):
+        wing = dept.get("location", "").split(",")[0].strip() or "Other Services"
+        groups.setdefault(wing, []).append({"name": dept["name"], **states.get(dept["name"], {})})
+        known.add(dept["name"])
+    for name in sorted(set(states) - known):
+        groups.setdefault("Other Services", []).append({"name": name, **states[name]})
+    return groups
+
+def get_schedule_status():
+    """
+    Visiting-hours state and doctors in now, from the backend's parsed schedules.
+    Returns None when the backend can't be reached.
+    """
     try:
-        history = [m["content"] for m in st.session_state.messages if m["role"] == "user"]
-        payload = {"message": prompt, "history": history}
-        
-        with st.spinner("Processing..."):
-            response = requests.post(API_URL, json=payload)
-            response.raise_for_status()
-            data = response.json()
-            st.session_state.messages.append({"role": "assistant", "content": data["response"]})
-    except Exception as e:
-        st.session_state.messages.append({"role": "assistant", "content": f"Connection Error: {str(e)}"})
+        return get_api_client().get_json("/schedule/now")
+    except Exception:
+        return None
+
+@st.cache_data(max_entries=2)
+def _parse_hospital_info(path: str, mtime_ns: int) -> Dict:
+    # mtime_ns is only part of the cache key: an edited file gets a fresh entry
+    with open(path, "r") as f:
+        return json.load(f)
+
+def load_hospital_info() -> Dict:
+    try:
+        return _parse_hospital_info(DATA_FILE_PATH, os.stat(DATA_FILE_PATH).st_mtime_ns)
+    except (OSError, ValueError):
+        return {}
+
+@st.cache_resource
+def get_api_client() -> HospiBotClient:
+    # One pooled keep-alive client per Streamlit process, shared by all sessions
+    return HospiBotClient(API_BASE_URL, hospital_id=HOSPITAL_ID)
+
+def send_message(prompt, container):
+    st.session_state.messages.append({"role": "user", "content": prompt})
+    # The backend keeps the conversation history for this session
+    payload = {"message": prompt, "session_id": st.session_state.user_id}
+    with container:
+        with st.chat_message("user", avatar="👤"):
+            st.markdown(prompt)
+        with st.chat_message("assistant", avatar="🏥"):
+            try:
+                content = st.write_stream(get_api_client().stream_chat(payload))
+                st.session_state.messages.append({"role": "assistant", "content": content})
+            except CircuitOpenError:
+                st.session_state.messages.append({"role": "assistant", "content": DEGRADED_MESSAGE})
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                content = BUSY_MESSAGES.get(status, f"Connection Error: {str(e)}")
+                st.session_state.messages.append({"role": "assistant", "content": content})
+            except Exception as e:
+                st.session_state.messages.append({"role": "assistant", "content": f"Connection Error: {str(e)}"})
 
 # --- LAYOUT ---
 
@@ -221,9 +323,9 @@ with tab_chat:
                     st.markdown(msg["content"])
         
         # Input
+        # send_message draws the new turn into the container itself, so no extra rerun is needed
         if prompt := st.chat_input("Ask about hours, doctors, or locations..."):
-            send_message(prompt)
-            st.rerun()
+            send_message(prompt, chat_container)
             
     with col_suggest:
         st.markdown("### Quick Actions")
@@ -239,102 +341,119 @@ with tab_chat:
         
         for label, query in actions:
             if st.button(label, use_container_width=True):
-                send_message(query)
-                st.rerun()
+                send_message(query, chat_container)
                 
         st.markdown("---")
         if st.button("🗑️ Clear Chat", type="secondary", use_container_width=True):
             st.session_state.messages = []
+            # Start a fresh backend session so old turns are not carried over
+            st.session_state.user_id = str(uuid.uuid4())
             st.rerun()
 
 # --- TAB 2: LIVE DASHBOARD ---
-with tab_dashboard:
+# A fragment reruns on its own timer without rerunning the chat tab.
+@st.fragment(run_every=DASHBOARD_REFRESH)
+def live_dashboard():
     st.markdown("### 📊 Real-Time Hospital Status")
     
     row1_1, row1_2, row1_3, row1_4 = st.columns(4)
-    
+    live = get_live_status()
+    feeds = (live or {}).get("metrics", {})
+
     with row1_1:
-         st.markdown(f"""
+        er = feeds.get("er_wait_minutes")
+        if er:
+            level = _level(er["latest"], ER_WAIT_LEVELS)
+            wait = f"{er['latest']:.0f}"
+            traffic = ("🟢 Low Traffic", "🟠 Moderate Traffic", "🔴 High Traffic")[level]
+            detail = f"{traffic} · 1h avg {er['windows']['1h']['mean']:.0f} mins"
+            color = LEVEL_COLORS[level]
+        else:
+            wait, detail, color = "–", "No live feed", "#64748B"
+        st.markdown(f"""
         <div class="glass-card">
             <div class="metric-label">ER Wait Time</div>
-            <div class="metric-value">{get_er_wait_time()} <span style="font-size:1rem; color:#64748B">mins</span></div>
-            <div style="font-size:0.8rem; margin-top:5px; color:#166534">🟢 Low Traffic</div>
+            <div class="metric-value">{wait} <span style="font-size:1rem; color:#64748B">mins</span></div>
+            <div style="font-size:0.8rem; margin-top:5px; color:{color}">{detail}</div>
         </div>
         """, unsafe_allow_html=True)
          
     with row1_2:
-        visiting_open = is_business_hours() # Simplified for demo
+        schedule = get_schedule_status()
+        if schedule and schedule["visiting_known"]:
+            visiting_open = schedule["visiting_open"]
+            today = datetime.datetime.now().strftime("%A")
+            day = "" if schedule["next_change_day"] == today else f"{schedule['next_change_day']} "
+            window = f"Closes at {day}{schedule['next_change']}" if visiting_open else f"Next Window: {day}{schedule['next_change']}"
+        else:
+            visiting_open, window = False, "Schedule unavailable"
         color = "#166534" if visiting_open else "#991B1B"
         text = "Active Now" if visiting_open else "Closed"
         st.markdown(f"""
         <div class="glass-card">
             <div class="metric-label">Visiting Hours</div>
             <div class="metric-value" style="font-size:1.8rem; color:{color}; -webkit-text-fill-color:{color}">{text}</div>
-            <div style="font-size:0.8rem; margin-top:5px">Next Window: 5:00 PM</div>
+            <div style="font-size:0.8rem; margin-top:5px">{window}</div>
         </div>
         """, unsafe_allow_html=True)
         
     with row1_3:
+        doctors_in = schedule["doctors_available"] if schedule else "–"
+        doctors_total = schedule["doctors_total"] if schedule else "–"
+        on_call = feeds.get("oncall_doctors")
+        on_call_text = f" · {on_call['latest']:.0f} on call" if on_call else ""
         st.markdown(f"""
         <div class="glass-card">
-            <div class="metric-label">On-Call Doctors</div>
-            <div class="metric-value">12</div>
-            <div style="font-size:0.8rem; margin-top:5px">Across 4 Depts</div>
+            <div class="metric-label">Doctors In Now</div>
+            <div class="metric-value">{doctors_in}</div>
+            <div style="font-size:0.8rem; margin-top:5px">Of {doctors_total} on staff{on_call_text}</div>
         </div>
         """, unsafe_allow_html=True)
         
     with row1_4:
+        icu = feeds.get("icu_occupancy_pct")
+        if icu:
+            level = _level(icu["latest"], ICU_LEVELS)
+            occupancy = f"{icu['latest']:.0f}%"
+            detail = ("Beds Available", "High Occupancy", "Restricted Access")[level]
+            color = LEVEL_COLORS[level]
+        else:
+            occupancy, detail, color = "–", "No live feed", "#64748B"
         st.markdown(f"""
         <div class="glass-card">
             <div class="metric-label">ICU Capacity</div>
-            <div class="metric-value" style="-webkit-text-fill-color:#EA580C">85%</div>
-            <div style="font-size:0.8rem; margin-top:5px">Restricted Access</div>
+            <div class="metric-value" style="-webkit-text-fill-color:{color}">{occupancy}</div>
+            <div style="font-size:0.8rem; margin-top:5px">{detail}</div>
         </div>
         """, unsafe_allow_html=True)
         
     st.markdown("### 🏥 Department Status")
-    
-    col_d1, col_d2 = st.columns(2)
-    with col_d1:
-        st.markdown("""
-        <div class="glass-card">
-            <h4>West Wing</h4>
-            <div style="margin:10px 0; display:flex; justify-content:space-between">
-                <span>🫀 Cardiology</span>
-                <span><span class="status-dot"></span>Open</span>
-            </div>
-            <div style="margin:10px 0; display:flex; justify-content:space-between">
-                <span>🧠 Neurology</span>
-                <span><span class="status-dot"></span>Open</span>
-            </div>
-            <div style="margin:10px 0; display:flex; justify-content:space-between">
-                <span>🦴 Orthopedics</span>
-                <span><span class="status-dot"></span>Open</span>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-    with col_d2:
-         st.markdown("""
+
+    # Names and notes come from the live feed, so they are escaped before rendering
+    dots = {"open": "status-dot", "busy": "status-dot-red", "closed": "status-dot-grey"}
+    columns = st.columns(2)
+    for i, (wing, rows) in enumerate(department_rows(live).items()):
+        lines = []
+        for row in rows:
+            state = row.get("state")
+            label = state.title() if state else "No update"
+            note = f" · {row['note']}" if row.get("note") else ""
+            title = f"{_updated_ago(row['updated_at'])}{note}" if state else ""
+            icon = DEPARTMENT_ICONS.get(row["name"], "🏥")
+            lines.append(f"""
+            <div style="margin:10px 0; display:flex; justify-content:space-between" title="{html.escape(title)}">
+                <span>{icon} {html.escape(row['name'])}</span>
+                <span><span class="{dots.get(state, 'status-dot-grey')}"></span>{label}</span>
+            </div>""")
+        with columns[i % 2]:
+            st.markdown(f"""
         <div class="glass-card">
-            <h4>East Wing</h4>
-            <div style="margin:10px 0; display:flex; justify-content:space-between">
-                <span>👶 Pediatrics</span>
-                <span><span class="status-dot"></span>Open</span>
-            </div>
-            <div style="margin:10px 0; display:flex; justify-content:space-between">
-                <span>☢️ Radiology</span>
-                <span><span class="status-dot-red"></span>Busy</span>
-            </div>
-            <div style="margin:10px 0; display:flex; justify-content:space-between">
-                <span>💊 Pharmacy</span>
-                <span><span class="status-dot"></span>Open</span>
-            </div>
+            <h4>{html.escape(wing)}</h4>{"".join(lines)}
         </div>
         """, unsafe_allow_html=True)
 
-
-import textwrap
+with tab_dashboard:
+    live_dashboard()
 
 # --- TAB 3: RESOURCES ---
 with tab_info:
@@ -351,13 +470,9 @@ with tab_info:
         """), unsafe_allow_html=True)
         
     with col_i2:
-        # Load data dynamically
-        try:
-            with open("data/hospital_info.json", "r") as f:
-                import json
-                info = json.load(f)["general_info"]["contacts"]
-        except:
-             info = {"emergency": "555-0199", "general": "555-0000", "billing": "555-0000", "advocacy": "555-0000"}
+        # Load data dynamically; parsed once per file version, not on every rerun
+        info = load_hospital_info().get("general_info", {}).get("contacts") or \
+            {"emergency": "555-0199", "general": "555-0000", "billing": "555-0000", "advocacy": "555-0000"}
 
         st.markdown(textwrap.dedent(f"""
             <div class="glass-card">